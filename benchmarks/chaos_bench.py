@@ -0,0 +1,93 @@
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import (
+    build_client_hello, measure_latency_ms, measure_rate, result, run_suite
+)
+from core.engine import ChaosEngine, ChaosEnginePool, CompactChaosEngine
+from core.metrics import StreamingChaosMetrics
+from core.tls import TLSFragmenter
+from server.protocols import HTTPHandler
+
+HELLO_SIZES = (256, 517, 1024, 1800)
+
+def bench_mix_entropy(min_time: float) -> dict:
+    engine = ChaosEngine(seed=1)
+    compact = CompactChaosEngine(seed=1)
+    return {
+        'mix_entropy.engine': result(measure_rate(engine._mix_entropy, min_time, 1000), 'samples/s'),
+        'mix_entropy.compact': result(measure_rate(compact._mix_entropy, min_time, 1000), 'samples/s'),
+    }
+
+def bench_fragment(min_time: float) -> dict:
+    results = {}
+    for aggressive in (True, False):
+        mode = 'aggressive' if aggressive else 'normal'
+        for size in HELLO_SIZES:
+            hello = build_client_hello('www.example-benchmark.com', size)
+            fragmenter = TLSFragmenter(CompactChaosEngine(seed=1), aggressive=aggressive)
+            results[f'fragment.{mode}.{size}'] = result(
+                measure_rate(lambda: fragmenter.fragment(hello), min_time), 'plans/s'
+            )
+    return results
+
+def bench_metrics(rounds: int) -> dict:
+    engine = ChaosEngine(seed=1)
+    while len(engine.history) < engine.history.maxlen:
+        engine._mix_entropy()
+
+    def uncached():
+        engine._metrics_cache = None
+        engine.get_chaos_metrics()
+
+    def full_recompute():
+        metrics = StreamingChaosMetrics(window=engine.metrics.window, r=engine.r)
+        metrics.extend(engine.history)
+        metrics.snapshot()
+
+    return {
+        'chaos_metrics.snapshot': result(measure_latency_ms(uncached, rounds), 'ms', higher_is_better=False),
+        'chaos_metrics.full_recompute': result(measure_latency_ms(full_recompute, rounds), 'ms', higher_is_better=False),
+        'chaos_metrics.cached': result(measure_latency_ms(engine.get_chaos_metrics, rounds), 'ms', higher_is_better=False),
+    }
+
+def bench_allocation(connections: int) -> dict:
+    template = TLSFragmenter(ChaosEngine(seed=1))
+    handler = HTTPHandler(None, None, None, None, template, None, ChaosEnginePool(seed=1))
+    hello = build_client_hello('www.example-benchmark.com')
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    live = [handler._make_fragmenter() for _ in range(connections)]
+    for fragmenter in live:
+        fragmenter.fragment(hello)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return {
+        'make_fragmenter.bytes_per_connection': result(
+            (after - before) / connections, 'bytes', higher_is_better=False
+        ),
+    }
+
+def collect(args) -> dict:
+    min_time = 0.1 if args.quick else 0.5
+    rounds = 10 if args.quick else 50
+    connections = 1000 if args.quick else 10000
+
+    results = {}
+    results.update(bench_mix_entropy(min_time))
+    results.update(bench_fragment(min_time))
+    results.update(bench_metrics(rounds))
+    results.update(bench_allocation(connections))
+
+    return results
+
+def main(argv=None) -> int:
+    return run_suite('chaos', collect, argv, description='ChaosEngine / TLSFragmenter microbenchmarks')
+
+if __name__ == '__main__':
+    sys.exit(main())
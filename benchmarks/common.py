@@ -0,0 +1,113 @@
+import argparse
+import json
+import platform
+import struct
+import sys
+import time
+from typing import Callable, Optional
+
+def measure_rate(fn: Callable[[], object], min_time: float = 0.5, batch: int = 100) -> float:
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        for _ in range(batch):
+            fn()
+        calls += batch
+        elapsed = time.perf_counter() - start
+    return calls / elapsed
+
+def measure_latency_ms(fn: Callable[[], object], rounds: int = 50) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+def build_client_hello(sni: str, size: int = 517) -> bytes:
+    name = sni.encode('ascii')
+    server_name = struct.pack('!BH', 0, len(name)) + name
+    sni_ext = struct.pack('!HHH', 0x0000, len(server_name) + 2, len(server_name)) + server_name
+
+    ciphers = bytes.fromhex('130113021303c02bc02fc02cc030')
+    body = (
+        b'\x03\x03' + bytes(32) +
+        b'\x20' + bytes(32) +
+        struct.pack('!H', len(ciphers)) + ciphers +
+        b'\x01\x00'
+    )
+
+    fixed = 5 + 4 + len(body) + 2 + len(sni_ext) + 4
+    padding_len = max(0, size - fixed)
+    padding_ext = struct.pack('!HH', 0x0015, padding_len) + bytes(padding_len)
+
+    extensions = sni_ext + padding_ext
+    body += struct.pack('!H', len(extensions)) + extensions
+
+    handshake = b'\x01' + len(body).to_bytes(3, 'big') + body
+    return b'\x16\x03\x01' + struct.pack('!H', len(handshake)) + handshake
+
+def result(value: float, unit: str, higher_is_better: bool = True) -> dict:
+    return {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+
+def write_results(suite: str, results: dict, path: Optional[str]) -> dict:
+    report = {
+        'suite': suite,
+        'timestamp': time.time(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return report
+
+def compare_to_baseline(results: dict, baseline_path: str, threshold: float) -> list:
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f).get('results', {})
+
+    regressions = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None or not base.get('value'):
+            continue
+
+        change = (current['value'] - base['value']) / base['value']
+        if not base.get('higher_is_better', True):
+            change = -change
+
+        status = 'REGRESSION' if change < -threshold else 'ok'
+        print(f"{name:<40} {base['value']:>14.3f} -> {current['value']:>14.3f} "
+              f"{current['unit']:<10} {change * 100:+7.1f}%  {status}")
+        if status == 'REGRESSION':
+            regressions.append(name)
+
+    return regressions
+
+def run_suite(name: str, collect: Callable[[argparse.Namespace], dict], argv=None,
+              description: Optional[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--output', help='write JSON results to this file (default: stdout)')
+    parser.add_argument('--baseline', help='compare against a previously written results file')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='allowed relative regression before failing (default: 0.15)')
+    parser.add_argument('--quick', action='store_true', help='shorter runs for smoke testing')
+    args = parser.parse_args(argv)
+
+    results = collect(args)
+    write_results(name, results, args.output)
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, args.baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.threshold * 100:.0f}%")
+            return 1
+        print("✓ No regressions")
+
+    return 0
@@ -0,0 +1,116 @@
+import ipaddress
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import measure_rate, result, run_suite
+from utils.domains import DomainMatcher
+from utils.ipindex import IPRangeIndex
+
+TLDS = ('com', 'net', 'org', 'ir', 'io', 'co.uk', 'ac.ir')
+
+def build_domains(count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    alphabet = 'abcdefghijklmnopqrstuvwxyz0123456789'
+    domains = set()
+    while len(domains) < count:
+        name = ''.join(rng.choice(alphabet) for _ in range(rng.randint(4, 14)))
+        domain = f"{name}.{rng.choice(TLDS)}"
+        domains.add('.' + domain if rng.random() < 0.05 else domain)
+    return sorted(domains)
+
+def build_queries(domains: list, count: int, seed: int = 2) -> list:
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        if i % 2:
+            queries.append(f"www.cdn{i}.{rng.choice(domains).lstrip('.')}")
+        else:
+            queries.append(f"www.miss{i}.example-{i}.com")
+    return queries
+
+def legacy_match(domains: set, hostname: str) -> bool:
+    hostname = hostname.lower()
+    if hostname in domains:
+        return True
+    for domain in domains:
+        if domain.startswith('.') and hostname.endswith(domain):
+            return True
+        if not domain.startswith('.') and hostname.endswith('.' + domain):
+            return True
+    return False
+
+def bench_lookup(size: int, min_time: float) -> dict:
+    domains = build_domains(size)
+    queries = build_queries(domains, 1000)
+
+    start = time.perf_counter()
+    matcher = DomainMatcher(domains)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    domain_set = set(domains)
+    for query in queries[:50]:
+        assert (query in matcher) == legacy_match(domain_set, query), query
+
+    it = iter(range(1 << 62))
+
+    def matcher_lookup():
+        matcher.match(queries[next(it) % len(queries)])
+
+    def legacy_lookup():
+        legacy_match(domain_set, queries[next(it) % len(queries)])
+
+    return {
+        f'domains.{size}.build': result(build_ms, 'ms', higher_is_better=False),
+        f'domains.{size}.matcher': result(measure_rate(matcher_lookup, min_time, 1000), 'lookups/s'),
+        f'domains.{size}.legacy_loop': result(measure_rate(legacy_lookup, min_time, 1), 'lookups/s'),
+    }
+
+def bench_ip_index(min_time: float) -> dict:
+    config = Path(__file__).resolve().parent.parent / 'config' / 'iranian_domains.json'
+    with open(config, 'r', encoding='utf-8') as f:
+        networks = [ipaddress.ip_network(r) for r in json.load(f).get('ip_ranges', [])]
+
+    rng = random.Random(3)
+    ips = [str(ipaddress.IPv4Address(rng.getrandbits(32))) for _ in range(1000)]
+    index = IPRangeIndex(networks)
+
+    assert list(index.contains_many(ips)) == [index.contains(ip) for ip in ips]
+
+    it = iter(range(1 << 62))
+
+    def index_lookup():
+        index.contains(ips[next(it) % len(ips)])
+
+    def legacy_lookup():
+        ip = ipaddress.ip_address(ips[next(it) % len(ips)])
+        any(ip in network for network in networks)
+
+    return {
+        f'ip_ranges.{len(networks)}.index': result(measure_rate(index_lookup, min_time, 1000), 'lookups/s'),
+        f'ip_ranges.{len(networks)}.batch': result(
+            measure_rate(lambda: index.contains_many(ips), min_time, 1) * len(ips), 'lookups/s'
+        ),
+        f'ip_ranges.{len(networks)}.legacy_loop': result(measure_rate(legacy_lookup, min_time, 10), 'lookups/s'),
+    }
+
+def collect(args) -> dict:
+    min_time = 0.1 if args.quick else 0.5
+    sizes = (1000, 50000) if args.quick else (1000, 50000, 500000)
+
+    results = {}
+    for size in sizes:
+        results.update(bench_lookup(size, min_time))
+    results.update(bench_ip_index(min_time))
+
+    return results
+
+def main(argv=None) -> int:
+    return run_suite('domains', collect, argv, description='Routing policy matcher benchmarks')
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import result, run_suite
+from monitoring.stats import StatsCollector
+from server.protocols import HTTPHandler
+from utils import loop as event_loop
+
+CHUNK = 64 * 1024
+
+async def start_relay(upstream_port: int):
+    handler = HTTPHandler(None, None, None, StatsCollector())
+    active = set()
+
+    async def relay(reader, writer):
+        active.add(asyncio.current_task())
+        try:
+            remote_reader, remote_writer = await asyncio.open_connection('127.0.0.1', upstream_port)
+            await handler._relay_data(reader, writer, remote_reader, remote_writer)
+        finally:
+            active.discard(asyncio.current_task())
+
+    server = await asyncio.start_server(relay, '127.0.0.1', 0)
+    return server, active
+
+async def shutdown(relay, active: set, upstream):
+    relay.close()
+    if active:
+        await asyncio.wait(active, timeout=5)
+    upstream.close()
+
+async def bench_throughput(megabytes: int, streams: int) -> float:
+    received = 0
+
+    async def sink(reader, writer):
+        nonlocal received
+        while data := await reader.read(CHUNK):
+            received += len(data)
+        writer.close()
+
+    async def stream(port: int, size: int):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        payload = bytes(CHUNK)
+        for _ in range(size // CHUNK):
+            writer.write(payload)
+            await writer.drain()
+        writer.write_eof()
+        await reader.read()
+        writer.close()
+
+    upstream = await asyncio.start_server(sink, '127.0.0.1', 0)
+    relay, active = await start_relay(upstream.sockets[0].getsockname()[1])
+    port = relay.sockets[0].getsockname()[1]
+
+    size = megabytes * 1024 * 1024 // streams
+    start = time.perf_counter()
+    await asyncio.gather(*(stream(port, size) for _ in range(streams)))
+    elapsed = time.perf_counter() - start
+
+    await shutdown(relay, active, upstream)
+    return received / elapsed / 1024 / 1024
+
+async def bench_connections(min_time: float, concurrency: int) -> float:
+    async def echo(reader, writer):
+        while data := await reader.read(CHUNK):
+            writer.write(data)
+            await writer.drain()
+        writer.close()
+
+    upstream = await asyncio.start_server(echo, '127.0.0.1', 0)
+    relay, active = await start_relay(upstream.sockets[0].getsockname()[1])
+    port = relay.sockets[0].getsockname()[1]
+
+    completed = 0
+    deadline = time.perf_counter() + min_time
+
+    async def client():
+        nonlocal completed
+        while time.perf_counter() < deadline:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'ping')
+            await writer.drain()
+            await reader.readexactly(4)
+            writer.close()
+            await writer.wait_closed()
+            completed += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    await shutdown(relay, active, upstream)
+    return completed / elapsed
+
+async def bench_loop(megabytes: int, min_time: float) -> dict:
+    name = event_loop.loop_name()
+    return {
+        f'loop.{name}.relay_throughput': result(await bench_throughput(megabytes, 4), 'MB/s'),
+        f'loop.{name}.connections': result(await bench_connections(min_time, 32), 'conn/s'),
+    }
+
+def collect(args) -> dict:
+    megabytes = 64 if args.quick else 512
+    min_time = 0.5 if args.quick else 2.0
+
+    loops = ['asyncio']
+    if event_loop.uvloop_available():
+        loops.append('uvloop')
+    else:
+        print("⚠️  uvloop not installed, benchmarking asyncio only", file=sys.stderr)
+
+    results = {}
+    for name in loops:
+        results.update(event_loop.run(bench_loop(megabytes, min_time), name))
+
+    return results
+
+def main(argv=None) -> int:
+    return run_suite('loop', collect, argv, description='asyncio vs uvloop relay benchmarks')
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import measure_rate, result, run_suite
+from monitoring.stats import StatsCollector
+from server.protocols import WebSocketHandler
+from server.websocket import OP_BINARY, frame_header, unmask
+from utils import loop as event_loop
+
+FRAME = 64 * 1024
+
+def legacy_unmask(payload: bytes, key: bytes) -> bytes:
+    return bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+
+def masked_frame(payload: bytes) -> bytes:
+    key = os.urandom(4)
+    header = bytearray(frame_header(OP_BINARY, len(payload)))
+    header[1] |= 0x80
+    return bytes(header) + key + bytes(unmask(payload, key))
+
+def bench_unmask(size: int, min_time: float) -> dict:
+    payload = os.urandom(size)
+    key = os.urandom(4)
+    assert bytes(unmask(payload, key)) == legacy_unmask(payload, key)
+
+    batch = max(1, FRAME // size)
+    return {
+        f'ws.unmask.{size}': result(
+            measure_rate(lambda: unmask(payload, key), min_time, batch) * size / 1024 / 1024, 'MB/s'
+        ),
+        f'ws.unmask_legacy.{size}': result(
+            measure_rate(lambda: legacy_unmask(payload, key), min_time, 1) * size / 1024 / 1024, 'MB/s'
+        ),
+    }
+
+async def start_relay(upstream_port: int):
+    handler = WebSocketHandler(None, None, None, StatsCollector())
+    active = set()
+
+    async def relay(reader, writer):
+        active.add(asyncio.current_task())
+        try:
+            remote_reader, remote_writer = await asyncio.open_connection('127.0.0.1', upstream_port)
+            await handler._relay_ws(reader, writer, remote_reader, remote_writer)
+        finally:
+            active.discard(asyncio.current_task())
+
+    server = await asyncio.start_server(relay, '127.0.0.1', 0)
+    return server, active
+
+async def bench_upload(megabytes: int) -> float:
+    received = 0
+    done = asyncio.Event()
+    total = megabytes * 1024 * 1024
+
+    async def sink(reader, writer):
+        nonlocal received
+        while data := await reader.read(FRAME):
+            received += len(data)
+            if received >= total:
+                done.set()
+        writer.close()
+
+    upstream = await asyncio.start_server(sink, '127.0.0.1', 0)
+    relay, active = await start_relay(upstream.sockets[0].getsockname()[1])
+
+    frames = [masked_frame(os.urandom(FRAME)) for _ in range(16)]
+    reader, writer = await asyncio.open_connection('127.0.0.1', relay.sockets[0].getsockname()[1])
+    start = time.perf_counter()
+    for i in range(total // FRAME):
+        writer.write(frames[i % len(frames)])
+        await writer.drain()
+    await done.wait()
+    elapsed = time.perf_counter() - start
+
+    writer.close()
+    relay.close()
+    if active:
+        await asyncio.wait(active, timeout=5)
+    upstream.close()
+    return received / elapsed / 1024 / 1024
+
+async def bench_download(megabytes: int) -> float:
+    total = megabytes * 1024 * 1024
+
+    async def source(reader, writer):
+        payload = bytes(FRAME)
+        for _ in range(total // FRAME):
+            writer.write(payload)
+            await writer.drain()
+        writer.close()
+
+    upstream = await asyncio.start_server(source, '127.0.0.1', 0)
+    relay, active = await start_relay(upstream.sockets[0].getsockname()[1])
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', relay.sockets[0].getsockname()[1], limit=1 << 20)
+    received = 0
+    start = time.perf_counter()
+    while received < total:
+        first, second = await reader.readexactly(2)
+        length = second & 0x7F
+        if length == 126:
+            length = int.from_bytes(await reader.readexactly(2), 'big')
+        elif length == 127:
+            length = int.from_bytes(await reader.readexactly(8), 'big')
+        await reader.readexactly(length)
+        received += length
+    elapsed = time.perf_counter() - start
+
+    writer.close()
+    relay.close()
+    if active:
+        await asyncio.wait(active, timeout=5)
+    upstream.close()
+    return received / elapsed / 1024 / 1024
+
+async def bench_relay(megabytes: int) -> dict:
+    return {
+        'ws.relay_upload': result(await bench_upload(megabytes), 'MB/s'),
+        'ws.relay_download': result(await bench_download(megabytes), 'MB/s'),
+    }
+
+def collect(args) -> dict:
+    min_time = 0.1 if args.quick else 0.5
+    megabytes = 64 if args.quick else 512
+
+    results = {}
+    for size in (125, 4096, FRAME, 1024 * 1024):
+        results.update(bench_unmask(size, min_time))
+    results.update(event_loop.run(bench_relay(megabytes)))
+
+    return results
+
+def main(argv=None) -> int:
+    return run_suite('ws', collect, argv, description='WebSocket codec and relay benchmarks')
+
+if __name__ == '__main__':
+    sys.exit(main())
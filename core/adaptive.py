@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from typing import Optional
+
+logger = logging.getLogger('CTE.Adaptive')
+
+class AdaptiveFragmentController:
+
+    def __init__(
+        self,
+        limiter=None,
+        enabled: bool = True,
+        min_level: float = 0.25,
+        min_jitter_scale: float = 0.2,
+        high_watermark: float = 0.8,
+        low_watermark: float = 0.5,
+        lag_target_ms: float = 50.0,
+        pending_target: int = 200,
+        interval: float = 0.5,
+        step: float = 0.15
+    ):
+        self.limiter = limiter
+        self.enabled = enabled
+        self.min_level = min_level
+        self.min_jitter_scale = min_jitter_scale
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.lag_target_ms = lag_target_ms
+        self.pending_target = pending_target
+        self.interval = interval
+        self.step = step
+
+        self.level = 1.0
+        self.pending = 0
+        self.loop_lag_ms = 0.0
+        self.pressure = 0.0
+        self.adjustments = 0
+
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"✓ Adaptive fragmentation: floor {self.min_level:.0%}, "
+                    f"jitter floor {self.min_jitter_scale:.0%}")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.loop_lag_ms = max(0.0, (loop.time() - expected) * 1000)
+            self.update()
+
+    def _utilization(self) -> float:
+        if self.limiter is None or not self.limiter.max_connections:
+            return 0.0
+        return self.limiter.current_connections / self.limiter.max_connections
+
+    def update(self):
+        self.pressure = max(
+            self._utilization(),
+            self.loop_lag_ms / self.lag_target_ms if self.lag_target_ms else 0.0,
+            self.pending / self.pending_target if self.pending_target else 0.0,
+        )
+
+        previous = self.level
+        if self.pressure > self.high_watermark:
+            self.level = max(self.min_level, self.level - self.step)
+        elif self.pressure < self.low_watermark:
+            self.level = min(1.0, self.level + self.step)
+
+        if self.level != previous:
+            self.adjustments += 1
+            logger.debug(f"Fragmentation level {previous:.2f} -> {self.level:.2f} "
+                         f"(pressure {self.pressure:.2f})")
+
+    def fragment_range(self, min_frags: int, max_frags: int) -> tuple:
+        if self.level >= 1.0:
+            return min_frags, max_frags
+        scaled = min_frags + int(round((max_frags - min_frags) * self.level))
+        return min_frags, max(min_frags, scaled)
+
+    def jitter_scale(self) -> float:
+        return max(self.min_jitter_scale, self.level)
+
+    def get_stats(self) -> dict:
+        return {
+            'enabled': self.enabled,
+            'level': self.level,
+            'jitter_scale': self.jitter_scale(),
+            'pressure': self.pressure,
+            'utilization': self._utilization(),
+            'loop_lag_ms': self.loop_lag_ms,
+            'pending_fragments': self.pending,
+            'adjustments': self.adjustments,
+        }
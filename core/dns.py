@@ -20,6 +20,7 @@ class DNSResolver:
         self.cache_max_size = cache_max_size
         self.cache_hits = 0
         self.cache_misses = 0
+        self._ssl = None
 
         self._load_servers(config_file)
 
@@ -107,6 +108,13 @@ class DNSResolver:
         logger.warning(f"Encrypted DNS failed for {hostname}, trying system DNS")
         return await self._system_resolve(hostname)
 
+    def _ssl_context(self) -> ssl.SSLContext:
+        if self._ssl is None:
+            self._ssl = ssl.create_default_context()
+            self._ssl.check_hostname = True
+            self._ssl.verify_mode = ssl.CERT_REQUIRED
+        return self._ssl
+
     async def _doh_query(self, hostname: str) -> Optional[str]:
         for server in self.doh_servers:
             try:
@@ -131,9 +139,7 @@ class DNSResolver:
 
         query_url = f"{path}?name={hostname}&type=A"
 
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = True
-        ssl_context.verify_mode = ssl.CERT_REQUIRED
+        ssl_context = self._ssl_context()
 
         server_ip = server.get('ip', host)
 
@@ -209,9 +215,7 @@ class DNSResolver:
 
     async def _query_dot_server(self, server: dict, hostname: str) -> Optional[str]:
         try:
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = True
-            ssl_context.verify_mode = ssl.CERT_REQUIRED
+            ssl_context = self._ssl_context()
 
             reader, writer = await asyncio.wait_for(
                 asyncio.open_connection(
@@ -1,80 +1,115 @@
 import time
-import math
+import uuid
 import hashlib
-import numpy as np
-from collections import deque
+from typing import Optional
 
-class ChaosEngine:  
-    def __init__(self, connection_id: bytes = None):
-        self.connection_id = connection_id or b''
+from core.metrics import StreamingChaosMetrics, ChaosFleetMonitor
 
-        self.sigma = 10.0
-        self.rho = 28.0
-        self.beta = 8.0 / 3.0
+class _ChaosCore:
 
-        self.r = 3.99
+    __slots__ = (
+        'connection_id', 'x', 'y', 'z', 'logistic_x',
+        'iteration', '_buffer', '_buffer_pos', '_recorded', 'seed',
+    )
 
-        self._initialize_state()
+    BATCH_SIZE = 32
 
-        self.iteration = 0
+    sigma = 10.0
+    rho = 28.0
+    beta = 8.0 / 3.0
+
+    r = 3.99
+
+    def _seed_digest(self) -> bytes:
+
+        if self.seed is not None:
+            seed_data = f"{self.seed}:{self.iteration}:".encode() + self.connection_id
+        else:
+            ns_time = time.time_ns()
+            seed_data = str(ns_time).encode() + self.connection_id
+
+        return hashlib.sha256(seed_data).digest()
+
+    @staticmethod
+    def _extract_float(hash_digest: bytes, offset: int) -> float:
+        val = int.from_bytes(hash_digest[offset:offset+8], 'big')
+        return val / (2**64)
+
+    def _apply_seed(self, hash_digest: bytes):
+
+        self.x = self._extract_float(hash_digest, 0) * 20 - 10
+        self.y = self._extract_float(hash_digest, 8) * 20 - 10
+        self.z = self._extract_float(hash_digest, 16) * 40
 
-        self.history = deque(maxlen=1000)
-        self.last_lyapunov = 0.0
-        self.last_entropy = 0.0
-        self.last_correlation_dim = 0.0
+        self.logistic_x = self._extract_float(hash_digest, 24)
 
     def _initialize_state(self):
 
-        ns_time = time.time_ns()
+        self._apply_seed(self._seed_digest())
 
-        seed_data = str(ns_time).encode() + self.connection_id
+    def _integrate(self, n: int, dt: float = 0.01) -> list:
 
-        hash_digest = hashlib.sha256(seed_data).digest()
+        sigma, rho, beta, r = self.sigma, self.rho, self.beta, self.r
+        x, y, z, lx = self.x, self.y, self.z, self.logistic_x
 
-        def extract_float(offset: int) -> float:
-            val = int.from_bytes(hash_digest[offset:offset+8], 'big')
-            return val / (2**64)
+        block = [0.0] * n
+        i = float(self.iteration)
+        for k in range(n):
+            dx = sigma * (y - x) * dt
+            dy = (x * (rho - z) - y) * dt
+            dz = (x * y - beta * z) * dt
+            x += dx
+            y += dy
+            z += dz
+            lx = r * lx * (1 - lx)
+            i += 1.0
+            block[k] = (((x + 10) / 20 + lx) % 1.0 + (i * 0.618033988749) % 1.0) % 1.0
 
-        self.x = extract_float(0) * 20 - 10
-        self.y = extract_float(8) * 20 - 10
-        self.z = extract_float(16) * 40
+        self.x, self.y, self.z, self.logistic_x = x, y, z, lx
+        self.iteration += n
 
-        self.logistic_x = extract_float(24)
+        return block
 
-        self.entropy_pool = [extract_float(i) for i in range(0, 32, 4)]
+    def _record(self, values: list):
 
-    def _lorenz_step(self, dt: float = 0.01):
+        pass
 
-        dx = self.sigma * (self.y - self.x) * dt
-        dy = (self.x * (self.rho - self.z) - self.y) * dt
-        dz = (self.x * self.y - self.beta * self.z) * dt
+    def _flush(self):
 
-        self.x += dx
-        self.y += dy
-        self.z += dz
+        if self._buffer_pos > self._recorded:
+            self._record(self._buffer[self._recorded:self._buffer_pos])
+        self._recorded = self._buffer_pos
 
-    def _logistic_step(self):
+    def _refill(self, n: int):
 
-        self.logistic_x = self.r * self.logistic_x * (1 - self.logistic_x)
+        self._flush()
+        block = self._integrate(max(n, self.BATCH_SIZE))
 
-    def _mix_entropy(self) -> float:
+        self._buffer = self._buffer[self._buffer_pos:] + block
+        self._buffer_pos = self._recorded = 0
+
+    def _take(self, n: int) -> list:
 
-        self._lorenz_step()
-        self._logistic_step()
+        if self._buffer_pos + n > len(self._buffer):
+            self._refill(n)
 
-        lorenz_contrib = (self.x + 10) / 20
-        logistic_contrib = self.logistic_x
+        start = self._buffer_pos
+        self._buffer_pos += n
+        return self._buffer[start:start + n]
 
-        mixed = (lorenz_contrib + logistic_contrib) % 1.0
+    def next_batch(self, n: int):
+        import numpy as np
 
-        self.iteration += 1
-        time_factor = (self.iteration * 0.618033988749) % 1.0
+        return np.array(self._take(n), dtype=np.float64)
 
-        final = (mixed + time_factor) % 1.0
+    def _mix_entropy(self) -> float:
 
-        self.history.append(final)
+        if self._buffer_pos >= len(self._buffer):
+            self._refill(1)
 
-        return final
+        value = self._buffer[self._buffer_pos]
+        self._buffer_pos += 1
+        return value
 
     def get_fragment_count(self, min_frags: int = 2, max_frags: int = 8) -> int:
 
@@ -96,9 +131,9 @@ class ChaosEngine:
         if safe_range < num_fragments - 1:
             return []
 
-        for i in range(num_fragments - 1):
-            chaos_val = self._mix_entropy()
+        chaos_vals = self._take(num_fragments - 1)
 
+        for i, chaos_val in enumerate(chaos_vals):
             segment_size = safe_range / num_fragments
             segment_base = safe_start + (i + 0.3) * segment_size
             segment_variance = segment_size * 0.4
@@ -133,60 +168,130 @@ class ChaosEngine:
 
     def reseed(self):
 
+        self._flush()
+        self.iteration -= len(self._buffer) - self._buffer_pos
+        self._buffer = []
+        self._buffer_pos = self._recorded = 0
+
         self._initialize_state()
 
-    def calculate_lyapunov_exponent(self, samples=100):
-        if len(self.history) < samples:
-            return self.last_lyapunov
+    def reset(self, connection_id: bytes = None, seed: Optional[int] = None):
 
-        recent = list(self.history)[-samples:]
+        self._flush()
+        self.connection_id = connection_id or b''
+        self.seed = seed
+        self.iteration = 0
+        self._buffer = []
+        self._buffer_pos = self._recorded = 0
 
-        lyap_sum = 0.0
-        for i in range(len(recent) - 1):
-            dx = abs(recent[i+1] - recent[i])
-            if dx > 1e-10:
-                lyap_sum += math.log(abs(self.r * (1 - 2 * recent[i])))
+        self._initialize_state()
 
-        self.last_lyapunov = lyap_sum / (len(recent) - 1) if len(recent) > 1 else 0.0
-        return self.last_lyapunov
+class ChaosEngine(_ChaosCore):
 
-    def calculate_shannon_entropy(self, bins=256):
-        if len(self.history) < 10:
-            return self.last_entropy
+    METRICS_TTL = 1.0
 
-        recent = list(self.history)[-1000:]
+    def __init__(self, connection_id: bytes = None, seed: Optional[int] = None):
+        self.connection_id = connection_id or b''
+        self.seed = seed
+        self.iteration = 0
+
+        self._initialize_state()
 
-        hist, _ = np.histogram(recent, bins=bins, range=(0, 1))
-        hist = hist / len(recent)
+        self._buffer = []
+        self._buffer_pos = self._recorded = 0
 
-        entropy = 0.0
-        for p in hist:
-            if p > 0:
-                entropy -= p * math.log2(p)
+        self.metrics = StreamingChaosMetrics(window=1000, r=self.r)
+        self.history = self.metrics.history
+        self._metrics_cache = None
+        self._metrics_cache_time = 0.0
 
-        self.last_entropy = entropy
-        return entropy
+    def _apply_seed(self, hash_digest: bytes):
 
-    def calculate_correlation_dimension(self, r=0.1):
-        if len(self.history) < 50:
-            return self.last_correlation_dim
+        super()._apply_seed(hash_digest)
 
-        recent = np.array(list(self.history)[-500:])
+        self.entropy_pool = [self._extract_float(hash_digest, i) for i in range(0, 32, 4)]
 
-        diff = np.abs(recent[:, None] - recent[None, :])
-        count = np.sum(diff < r) - len(recent)
-        total_pairs = len(recent) * (len(recent) - 1)
-        correlation = count / total_pairs if total_pairs > 0 else 0
+    def _record(self, values: list):
 
-        if correlation > 0:
-            self.last_correlation_dim = math.log(correlation) / math.log(r)
+        self.metrics.extend(values)
 
-        return self.last_correlation_dim
+    def calculate_lyapunov_exponent(self):
+        return self.metrics.lyapunov_exponent()
+
+    def calculate_shannon_entropy(self):
+        return self.metrics.shannon_entropy()
+
+    def calculate_correlation_dimension(self):
+        return self.metrics.correlation_dimension()
 
     def get_chaos_metrics(self):
+        now = time.monotonic()
+        if self._metrics_cache is None or now - self._metrics_cache_time >= self.METRICS_TTL:
+            self._flush()
+            self._metrics_cache = self.metrics.snapshot()
+            self._metrics_cache_time = now
+        return dict(self._metrics_cache)
+
+class CompactChaosEngine(_ChaosCore):
+
+    __slots__ = ('monitor',)
+
+    def __init__(self, connection_id: bytes = None, monitor: Optional[ChaosFleetMonitor] = None,
+                 seed: Optional[int] = None):
+        self.connection_id = connection_id or b''
+        self.seed = seed
+        self.iteration = 0
+
+        self._initialize_state()
+
+        self._buffer = []
+        self._buffer_pos = self._recorded = 0
+
+        self.monitor = monitor
+
+    def _record(self, values: list):
+
+        if self.monitor is not None:
+            self.monitor.offer(values)
+
+class ChaosEnginePool:
+
+    def __init__(self, max_size: int = 64, monitor: Optional[ChaosFleetMonitor] = None,
+                 seed: Optional[int] = None):
+        self.max_size = max_size
+        self.monitor = monitor
+        self.seed = seed
+        self._free = []
+        self._counter = 0
+        self.created = 0
+        self.reused = 0
+
+    def next_connection_id(self) -> bytes:
+        if self.seed is None:
+            return uuid.uuid4().bytes
+
+        self._counter += 1
+        return self._counter.to_bytes(8, 'big')
+
+    def checkout(self, connection_id: bytes = None) -> CompactChaosEngine:
+        if self._free:
+            engine = self._free.pop()
+            engine.reset(connection_id, seed=self.seed)
+            self.reused += 1
+            return engine
+
+        self.created += 1
+        return CompactChaosEngine(connection_id=connection_id, monitor=self.monitor, seed=self.seed)
+
+    def checkin(self, engine: CompactChaosEngine):
+        if len(self._free) < self.max_size:
+            self._free.append(engine)
+
+    def get_stats(self) -> dict:
         return {
-        'lyapunov_exponent': self.calculate_lyapunov_exponent(),
-        'shannon_entropy': self.calculate_shannon_entropy(),
-        'correlation_dimension': self.calculate_correlation_dimension(),
-        'samples_collected': len(self.history)
-        }
\ No newline at end of file
+            'idle': len(self._free),
+            'max_size': self.max_size,
+            'created': self.created,
+            'reused': self.reused,
+            'deterministic': self.seed is not None,
+        }
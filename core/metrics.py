@@ -0,0 +1,225 @@
+import math
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from itertools import islice
+
+class StreamingChaosMetrics:
+
+    RESYNC_INTERVAL = 10000
+
+    def __init__(self, window: int = 1000, bins: int = 256,
+                 lyapunov_samples: int = 100, correlation_samples: int = 500,
+                 correlation_r: float = 0.1, r: float = 3.99):
+        self.window = window
+        self.bins = bins
+        self.lyapunov_samples = lyapunov_samples
+        self.correlation_samples = correlation_samples
+        self.correlation_r = correlation_r
+        self.r = r
+
+        self.history = deque(maxlen=window)
+        self._unfolded = 0
+
+        self._folded = deque(maxlen=window)
+        self._prev = None
+        self._clog = [c * math.log2(c) if c > 0 else 0.0 for c in range(window + 1)]
+        self._reset()
+
+        self.last_lyapunov = 0.0
+        self.last_entropy = 0.0
+        self.last_correlation_dim = 0.0
+
+    def _reset(self):
+        self._folded.clear()
+        self._prev = None
+
+        self._bin_counts = [0] * self.bins
+        self._clog_sum = 0.0
+
+        self._lyap_terms = deque(maxlen=self.lyapunov_samples - 1)
+        self._lyap_sum = 0.0
+
+        self._corr_window = deque()
+        self._corr_sorted = []
+        self._corr_pairs = 0
+
+        self._pushes = 0
+
+    def _neighbours(self, value: float) -> int:
+        r = self.correlation_r
+        return bisect_left(self._corr_sorted, value + r) - bisect_right(self._corr_sorted, value - r)
+
+    def _fold(self, value: float):
+        folded = self._folded
+        counts = self._bin_counts
+        clog = self._clog
+
+        prev = self._prev
+        if prev is not None:
+            term = 0.0
+            if abs(value - prev) > 1e-10:
+                slope = abs(self.r * (1 - 2 * prev))
+                if slope > 0:
+                    term = math.log(slope)
+            if len(self._lyap_terms) == self._lyap_terms.maxlen:
+                self._lyap_sum -= self._lyap_terms[0]
+            self._lyap_terms.append(term)
+            self._lyap_sum += term
+        self._prev = value
+
+        bins = self.bins
+        if len(folded) == self.window:
+            b = min(bins - 1, int(folded[0] * bins))
+            self._clog_sum += clog[counts[b] - 1] - clog[counts[b]]
+            counts[b] -= 1
+
+        b = min(bins - 1, int(value * bins))
+        self._clog_sum += clog[counts[b] + 1] - clog[counts[b]]
+        counts[b] += 1
+
+        if len(self._corr_window) == self.correlation_samples:
+            old = self._corr_window.popleft()
+            del self._corr_sorted[bisect_left(self._corr_sorted, old)]
+            self._corr_pairs -= 2 * self._neighbours(old)
+
+        self._corr_pairs += 2 * self._neighbours(value)
+        insort(self._corr_sorted, value)
+        self._corr_window.append(value)
+
+        folded.append(value)
+
+        self._pushes += 1
+        if self._pushes >= self.RESYNC_INTERVAL:
+            self._resync()
+
+    def _resync(self):
+        self._lyap_sum = math.fsum(self._lyap_terms)
+        self._clog_sum = math.fsum(self._clog[c] for c in self._bin_counts)
+        self._pushes = 0
+
+    def _sync(self):
+        pending = self._unfolded
+        if not pending:
+            return
+        self._unfolded = 0
+
+        history = self.history
+        if pending >= len(history):
+            self._reset()
+            pending = len(history)
+        for value in islice(history, len(history) - pending, None):
+            self._fold(value)
+
+    def push(self, value: float):
+        self.history.append(value)
+        self._unfolded += 1
+
+    def extend(self, values):
+        self.history.extend(values)
+        self._unfolded += len(values)
+
+    def lyapunov_exponent(self) -> float:
+        self._sync()
+        if len(self.history) < self.lyapunov_samples:
+            return self.last_lyapunov
+
+        self.last_lyapunov = self._lyap_sum / len(self._lyap_terms)
+        return self.last_lyapunov
+
+    def shannon_entropy(self) -> float:
+        self._sync()
+        n = len(self.history)
+        if n < 10:
+            return self.last_entropy
+
+        self.last_entropy = max(0.0, math.log2(n) - self._clog_sum / n)
+        return self.last_entropy
+
+    def correlation_dimension(self) -> float:
+        self._sync()
+        n = len(self._corr_window)
+        if n < 50:
+            return self.last_correlation_dim
+
+        total_pairs = n * (n - 1)
+        correlation = self._corr_pairs / total_pairs if total_pairs > 0 else 0
+
+        if correlation > 0:
+            self.last_correlation_dim = math.log(correlation) / math.log(self.correlation_r)
+
+        return self.last_correlation_dim
+
+    def snapshot(self) -> dict:
+        return {
+            'lyapunov_exponent': self.lyapunov_exponent(),
+            'shannon_entropy': self.shannon_entropy(),
+            'correlation_dimension': self.correlation_dimension(),
+            'samples_collected': len(self.history)
+        }
+
+class ChaosFleetMonitor:
+
+    JITTER_BUCKETS_MS = (0.5, 1.0, 1.5, 2.0, 2.5, 3.0)
+    SNAPSHOT_TTL = 1.0
+
+    def __init__(self, sample_every: int = 8, reservoir_size: int = 1000):
+        self.sample_every = max(1, sample_every)
+        self.reservoir = deque(maxlen=reservoir_size)
+        self.metrics = StreamingChaosMetrics(window=reservoir_size)
+
+        self._offers = 0
+        self.blocks_sampled = 0
+
+        self.plans = 0
+        self.fragment_counts = {}
+        self.jitter_counts = [0] * (len(self.JITTER_BUCKETS_MS) + 1)
+        self._jitter_labels = self._bucket_labels(self.JITTER_BUCKETS_MS)
+
+        self._snapshot = None
+        self._snapshot_time = 0.0
+
+    @staticmethod
+    def _bucket_labels(bounds) -> list:
+        labels = [f"<{bounds[0]}"]
+        for lo, hi in zip(bounds, bounds[1:]):
+            labels.append(f"{lo}-{hi}")
+        labels.append(f"{bounds[-1]}+")
+        return labels
+
+    def offer(self, block: list):
+        self._offers += 1
+        if self._offers >= self.sample_every:
+            self._offers = 0
+            self.blocks_sampled += 1
+            self.reservoir.extend(block)
+
+    def record_plan(self, fragments: list):
+        self.plans += 1
+        n = len(fragments)
+        self.fragment_counts[n] = self.fragment_counts.get(n, 0) + 1
+
+        bounds = self.JITTER_BUCKETS_MS
+        counts = self.jitter_counts
+        for _, delay in fragments:
+            counts[bisect_right(bounds, delay * 1000)] += 1
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._snapshot_time < self.SNAPSHOT_TTL:
+            return self._snapshot
+
+        self.metrics.extend(self.reservoir)
+        self.reservoir.clear()
+
+        snapshot = self.metrics.snapshot()
+        snapshot['blocks_sampled'] = self.blocks_sampled
+        snapshot['plans'] = self.plans
+        snapshot['fragment_counts'] = {
+            str(n): self.fragment_counts[n] for n in sorted(self.fragment_counts)
+        }
+        snapshot['jitter_ms'] = dict(zip(self._jitter_labels, self.jitter_counts))
+
+        self._snapshot = snapshot
+        self._snapshot_time = now
+        return snapshot
@@ -0,0 +1,278 @@
+import asyncio
+import glob
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger('CTE.Strategy')
+
+STRATEGIES = ('direct', 'split', 'light', 'aggressive', 'records')
+(STRATEGY_DIRECT, STRATEGY_SPLIT, STRATEGY_LIGHT,
+ STRATEGY_AGGRESSIVE, STRATEGY_RECORDS) = range(len(STRATEGIES))
+
+SECOND_LEVEL_LABELS = {'co', 'com', 'net', 'org', 'ac', 'gov', 'edu', 'sch', 'id'}
+
+def registrable_domain(host: str) -> str:
+    labels = host.lower().rstrip('.').split('.')
+    if len(labels) <= 2:
+        return '.'.join(labels)
+    if len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_LABELS:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+class StrategyProbe:
+
+    __slots__ = ('cache', 'host', 'level', 'trial', 'settled', '_timer')
+
+    def __init__(self, cache, host: str, level: int, trial: bool = False):
+        self.cache = cache
+        self.host = host
+        self.level = level
+        self.trial = trial
+        self.settled = False
+        self._timer = None
+
+    def arm(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._timer = loop.call_later(self.cache.probe_window, self.abandon)
+
+    def _settle(self, ok: Optional[bool]):
+        if self.settled:
+            return
+        self.settled = True
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self.trial:
+            self.cache.trials.pop(self.host, None)
+        if ok is not None:
+            self.cache.record(self.host, self.level, ok)
+
+    def success(self):
+        self._settle(True)
+
+    def failure(self):
+        self._settle(False)
+
+    def abandon(self):
+        self._settle(None)
+
+class FragmentStrategyCache:
+
+    FLOOR_DECAY = 4
+
+    def __init__(self, default_level: int = STRATEGY_AGGRESSIVE, max_entries: int = 4096, path: Optional[str] = None,
+                 probe_window_ms: float = 60000, promote_after: int = 5, save_interval: float = 60):
+        self.default_level = max(0, min(len(STRATEGIES) - 1, default_level))
+        self.max_entries = max_entries
+        self.path = path
+        self.probe_window = probe_window_ms / 1000
+        self.promote_after = promote_after
+        self.save_interval = save_interval
+
+        self.entries = OrderedDict()
+        self.trials = {}
+        self.dirty = False
+        self._task: Optional[asyncio.Task] = None
+
+        self.successes = 0
+        self.failures = 0
+        self.escalations = 0
+        self.promotions = 0
+
+        if path:
+            self.load(path)
+
+    def _entry(self, key: str) -> Optional[list]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, entry: list):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def choose(self, host: str) -> int:
+        host = host.lower()
+        entry = self._entry(host) or self._entry(registrable_domain(host))
+        if entry is None:
+            return self.default_level
+
+        level, streak, floor = entry
+        if streak >= self.promote_after and level > floor and host not in self.trials:
+            self.trials[host] = level - 1
+            return level - 1
+        return level
+
+    def begin(self, host: str, level: int) -> StrategyProbe:
+        host = host.lower()
+        probe = StrategyProbe(self, host, level, self.trials.get(host) == level)
+        probe.arm()
+        return probe
+
+    def record(self, host: str, level: int, ok: bool):
+        if ok:
+            self.successes += 1
+        else:
+            self.failures += 1
+        self.dirty = True
+
+        keys = [host]
+        domain = registrable_domain(host)
+        if domain != host:
+            keys.append(domain)
+
+        for key in keys:
+            entry = self._entry(key)
+            if entry is None:
+                entry = [self.default_level, 0, 0]
+            self._store(key, self._update(key, entry, level, ok, key == host))
+
+    def _update(self, key: str, entry: list, level: int, ok: bool, count: bool) -> list:
+        current, streak, floor = entry
+        top = len(STRATEGIES) - 1
+
+        if ok:
+            if level < current:
+                self.promotions += count
+                logger.debug(f"Strategy for {key}: {STRATEGIES[current]} -> {STRATEGIES[level]}")
+                return [level, 0, min(floor, level)]
+            if level != current:
+                return entry
+            streak = min(streak + 1, self.promote_after * self.FLOOR_DECAY)
+            if floor and streak >= self.promote_after * self.FLOOR_DECAY:
+                floor = 0
+                logger.debug(f"Strategy for {key}: floor at {STRATEGIES[current]} expired")
+            return [current, streak, floor]
+
+        if level < current:
+            return [current, 0, current]
+
+        if current < top:
+            self.escalations += count
+            logger.info(f"📈 Strategy for {key}: {STRATEGIES[current]} -> {STRATEGIES[current + 1]}")
+            current += 1
+        return [current, 0, floor]
+
+    def _worker_files(self, path: str) -> list:
+        return [candidate for candidate in glob.glob(glob.escape(path) + '.*')
+                if candidate[len(path) + 1:].isdigit()]
+
+    def _sources(self, path: str) -> list:
+        sources = []
+        for candidate in [path] + self._worker_files(path):
+            try:
+                sources.append((os.path.getmtime(candidate), candidate))
+            except OSError:
+                continue
+        return [candidate for _, candidate in sorted(sources)]
+
+    def load(self, path: str) -> int:
+        sources = self._sources(path)
+        for source in sources:
+            self._load_file(source)
+
+        if sources:
+            logger.info(f"✓ Loaded {len(self.entries)} learned fragmentation strategies from {', '.join(sources)}")
+        return len(self.entries)
+
+    def _load_file(self, path: str):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot load strategy cache {path}: {e}")
+            return
+
+        entries = data.get('entries') if isinstance(data, dict) else None
+        if not isinstance(entries, list):
+            logger.warning(f"Cannot load strategy cache {path}: unexpected format")
+            return
+
+        top = len(STRATEGIES) - 1
+        for item in entries[-self.max_entries:]:
+            try:
+                key, entry = item
+                level, streak, floor = (int(v) for v in entry)
+            except (TypeError, ValueError):
+                continue
+            if not isinstance(key, str):
+                continue
+            level = min(top, max(0, level))
+            streak = min(self.promote_after * self.FLOOR_DECAY, max(0, streak))
+            self._store(key, [level, streak, min(level, max(0, floor))])
+
+    def _write(self, path: str) -> bool:
+        tmp = path + '.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'entries': list(self.entries.items())}, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.error(f"Cannot write strategy cache {path}: {e}")
+            return False
+        self.dirty = False
+        return True
+
+    def save(self, path: Optional[str] = None) -> int:
+        path = path or self.path
+        if not path or not self._write(path):
+            return 0
+
+        logger.info(f"📝 Strategy cache: {len(self.entries)} entries written to {path}")
+        return len(self.entries)
+
+    def consolidate(self) -> int:
+        if not self.path:
+            return 0
+        merged = self._worker_files(self.path)
+        if not merged or not self.save(self.path):
+            return 0
+        for candidate in merged:
+            try:
+                os.remove(candidate)
+            except OSError as e:
+                logger.warning(f"Cannot remove merged strategy cache {candidate}: {e}")
+        logger.info(f"🔗 Strategy cache: merged {len(merged)} worker file(s) into {self.path}")
+        return len(merged)
+
+    def start(self, path: Optional[str] = None):
+        if self._task is not None or self.save_interval <= 0 or not (path or self.path):
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run(path or self.path))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, path: str):
+        while True:
+            await asyncio.sleep(self.save_interval)
+            if self.dirty and self._write(path):
+                logger.debug(f"Strategy cache: {len(self.entries)} entries written to {path}")
+
+    def get_stats(self) -> dict:
+        levels = [0] * len(STRATEGIES)
+        for level, _, _ in self.entries.values():
+            levels[level] += 1
+        return {
+            'entries': len(self.entries),
+            'successes': self.successes,
+            'failures': self.failures,
+            'escalations': self.escalations,
+            'promotions': self.promotions,
+            'levels': dict(zip(STRATEGIES, levels)),
+        }
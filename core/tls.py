@@ -1,5 +1,10 @@
 import struct
 import logging
+from typing import Optional, Tuple
+
+from core.strategy import (
+    STRATEGY_DIRECT, STRATEGY_SPLIT, STRATEGY_LIGHT, STRATEGY_AGGRESSIVE, STRATEGY_RECORDS
+)
 
 logger = logging.getLogger('CTE.TLS')
 
@@ -28,38 +33,38 @@ class TLSParser:
         return data[5] == TLSParser.CLIENT_HELLO
 
     @staticmethod
-    def extract_sni(data: bytes) -> str:
+    def find_sni_span(data: bytes) -> Optional[Tuple[int, int]]:
         try:
             if not TLSParser.is_client_hello(data):
-                return ""
+                return None
 
             pos = 5 + 4
 
             if pos + 2 > len(data):
-                return ""
+                return None
             pos += 2
 
             if pos + 32 > len(data):
-                return ""
+                return None
             pos += 32
 
             if pos + 1 > len(data):
-                return ""
+                return None
             session_id_len = data[pos]
             pos += 1 + session_id_len
 
             if pos + 2 > len(data):
-                return ""
+                return None
             cipher_suites_len = struct.unpack('!H', data[pos:pos+2])[0]
             pos += 2 + cipher_suites_len
 
             if pos + 1 > len(data):
-                return ""
+                return None
             compression_len = data[pos]
             pos += 1 + compression_len
 
             if pos + 2 > len(data):
-                return ""
+                return None
             extensions_len = struct.unpack('!H', data[pos:pos+2])[0]
             pos += 2
 
@@ -71,7 +76,7 @@ class TLSParser:
 
                 if ext_type == 0x0000:
                     if pos + 2 > len(data):
-                        return ""
+                        return None
                     sni_list_len = struct.unpack('!H', data[pos:pos+2])[0]
                     p = pos + 2
                     while p + 3 <= pos + 2 + sni_list_len and p + 3 <= len(data):
@@ -79,64 +84,192 @@ class TLSParser:
                         name_len = struct.unpack('!H', data[p+1:p+3])[0]
                         p += 3
                         if name_type == 0x00 and p + name_len <= len(data):
-                            sni = data[p:p+name_len].decode('ascii', errors='ignore')
-                            return sni.lstrip('\x00')
+                            return (p, p + name_len)
                         p += name_len
-                    return ""
+                    return None
 
                 pos += ext_len
 
-            return ""
+            return None
         except:
+            return None
+
+    @staticmethod
+    def extract_sni(data: bytes) -> str:
+        span = TLSParser.find_sni_span(data)
+        if not span:
             return ""
+        sni = data[span[0]:span[1]].decode('ascii', errors='ignore')
+        return sni.lstrip('\x00')
 
 class TLSFragmenter:
 
-    def __init__(self, chaos_engine, aggressive=True):
+    SNI_AWARE_FRAGMENTS = {True: (2, 4), False: (2, 3)}
+    SPREAD_FRAGMENTS = {True: (3, 7), False: (2, 4)}
+
+    def __init__(self, chaos_engine, aggressive=True, sni_aware=True, monitor=None, trace=None,
+                 controller=None, strategies=None):
 
         self.chaos = chaos_engine
         self.aggressive = aggressive
+        self.sni_aware = sni_aware
+        self.monitor = monitor
+        self.trace = trace
+        self.controller = controller
+        self.strategies = strategies
+        self.probe = None
+        self.level = None
+
+    def spawn(self, chaos_engine) -> 'TLSFragmenter':
+        return TLSFragmenter(
+            chaos_engine,
+            aggressive=self.aggressive,
+            sni_aware=self.sni_aware,
+            monitor=self.monitor,
+            trace=self.trace,
+            controller=self.controller,
+            strategies=self.strategies
+        )
+
+    def _fragment_range(self, ranges: dict, aggressive: bool) -> tuple:
+        min_frags, max_frags = ranges[aggressive]
+        if self.controller is not None:
+            return self.controller.fragment_range(min_frags, max_frags)
+        return min_frags, max_frags
+
+    def _record_plan(self, data: bytes, sni: str, fragments: list):
+        if self.monitor is not None:
+            self.monitor.record_plan(fragments)
+        if self.trace is not None:
+            self.trace.record(self.chaos.connection_id, sni, len(data), fragments)
+
+    def _sni_positions(self, data: bytes, num_fragments: int) -> list:
+        span = TLSParser.find_sni_span(data)
+        if not span:
+            return []
+
+        sni_start, sni_end = span
+        if sni_end - sni_start < 2:
+            return []
+
+        chaos_val = self.chaos._mix_entropy()
+        sni_cut = sni_start + 1 + int(chaos_val * (sni_end - sni_start - 1))
+        sni_cut = min(sni_end - 1, sni_cut)
+
+        positions = [sni_cut]
+        for pos in self.chaos.get_fragment_positions(len(data), num_fragments - 1):
+            if pos < sni_start - 5 or pos > sni_end + 5:
+                positions.append(pos)
+
+        return sorted(positions)
+
+    def _choose_strategy(self, sni: str, level: Optional[int] = None) -> int:
+        if self.strategies is not None and sni:
+            if level is None:
+                level = self.strategies.choose(sni)
+            self.probe = self.strategies.begin(sni, level)
+        if level is None:
+            level = STRATEGY_AGGRESSIVE if self.aggressive else STRATEGY_LIGHT
+        self.level = level
+        return level
+
+    def _split_records(self, data: bytes, sni: str) -> list:
+        record_end = 5 + struct.unpack('!H', data[3:5])[0]
+        payload = data[5:record_end]
+        span = TLSParser.find_sni_span(data)
+        if span and span[1] - span[0] >= 2 and span[1] <= record_end:
+            cut = span[0] - 5 + 1 + int(self.chaos._mix_entropy() * (span[1] - span[0] - 1))
+        else:
+            cut = 1 + int(self.chaos._mix_entropy() * (len(payload) - 1))
+
+        jitter_scale = self.controller.jitter_scale() if self.controller is not None else 1.0
+
+        fragments = []
+        for part in (payload[:cut], payload[cut:]):
+            record = data[:3] + struct.pack('!H', len(part)) + part
+            delay = self.chaos.get_jitter_delay(base_ms=0.5, variance=2.5) * jitter_scale
+            fragments.append((record, delay))
 
-    def fragment(self, data: bytes) -> list:
+        if len(data) > record_end:
+            record, delay = fragments[-1]
+            fragments[-1] = (record + data[record_end:], delay)
+
+        logger.info(f"🧩 Splitting ClientHello into TLS records for: {sni or 'unknown'}")
+        self._record_plan(data, sni, fragments)
+        return fragments
+
+    def fragment(self, data: bytes, level: Optional[int] = None) -> list:
 
         if not TLSParser.is_client_hello(data):
             return [(data, 0)]
 
         total_len = len(data)
+        sni = TLSParser.extract_sni(data)
 
-        if self.aggressive:
-            num_fragments = self.chaos.get_fragment_count(min_frags=3, max_frags=7)
-        else:
-            num_fragments = self.chaos.get_fragment_count(min_frags=2, max_frags=4)
+        level = self._choose_strategy(sni, level)
+        if level == STRATEGY_DIRECT:
+            logger.debug(f"Learned strategy for {sni}: send whole")
+            self._record_plan(data, sni, [(data, 0)])
+            return [(data, 0)]
+
+        if level == STRATEGY_RECORDS and total_len > 6:
+            return self._split_records(data, sni)
 
-        positions = self.chaos.get_fragment_positions(total_len, num_fragments)
+        aggressive = level >= STRATEGY_AGGRESSIVE
+
+        positions = []
+        if level == STRATEGY_SPLIT:
+            positions = self._sni_positions(data, 1) or self.chaos.get_fragment_positions(total_len, 2)
+        elif self.sni_aware:
+            min_frags, max_frags = self._fragment_range(self.SNI_AWARE_FRAGMENTS, aggressive)
+            num_fragments = self.chaos.get_fragment_count(min_frags=min_frags, max_frags=max_frags)
+            positions = self._sni_positions(data, num_fragments)
+
+        if not positions and level != STRATEGY_SPLIT:
+            min_frags, max_frags = self._fragment_range(self.SPREAD_FRAGMENTS, aggressive)
+            num_fragments = self.chaos.get_fragment_count(min_frags=min_frags, max_frags=max_frags)
+            positions = self.chaos.get_fragment_positions(total_len, num_fragments)
 
         if not positions:
             logger.debug(f"Cannot fragment safely (len={total_len}), sending whole")
+            self._record_plan(data, sni, [(data, 0)])
             return [(data, 0)]
 
-        sni = TLSParser.extract_sni(data)
         if sni:
             logger.info(f"🎯 Fragmenting ClientHello for: {sni}")
 
-        logger.debug(f"Splitting into {num_fragments} fragments at positions: {positions}")
+        logger.debug(f"Splitting into {len(positions) + 1} fragments at positions: {positions}")
+
+        if level == STRATEGY_SPLIT:
+            fragments = []
+            last_pos = 0
+            for pos in positions:
+                fragments.append((data[last_pos:pos], 0))
+                last_pos = pos
+            fragments.append((data[last_pos:], 0))
+            self._record_plan(data, sni, fragments)
+            return fragments
+
+        jitter_scale = self.controller.jitter_scale() if self.controller is not None else 1.0
 
         fragments = []
         last_pos = 0
 
         for pos in positions:
             chunk = data[last_pos:pos]
-            delay = self.chaos.get_jitter_delay(base_ms=0.5, variance=2.5)
+            delay = self.chaos.get_jitter_delay(base_ms=0.5, variance=2.5) * jitter_scale
             fragments.append((chunk, delay))
             last_pos = pos
 
         final_chunk = data[last_pos:]
-        final_delay = self.chaos.get_jitter_delay(base_ms=0.3, variance=1.5)
+        final_delay = self.chaos.get_jitter_delay(base_ms=0.3, variance=1.5) * jitter_scale
         fragments.append((final_chunk, final_delay))
 
         sizes = [len(f[0]) for f in fragments]
         logger.debug(f"Fragment sizes: {sizes}")
 
+        self._record_plan(data, sni, fragments)
+
         return fragments
 
     def randomize_record_size(self, data: bytes) -> list:
@@ -0,0 +1,39 @@
+import json
+import logging
+from collections import deque
+
+logger = logging.getLogger('CTE.Trace')
+
+class ChaosTrace:
+
+    def __init__(self, max_entries: int = 10000):
+        self.entries = deque(maxlen=max_entries)
+        self.recorded = 0
+
+    def record(self, connection_id: bytes, sni: str, total_length: int, fragments: list):
+        self.recorded += 1
+        self.entries.append({
+            'seq': self.recorded,
+            'connection_id': connection_id.hex(),
+            'sni': sni,
+            'length': total_length,
+            'sizes': [len(chunk) for chunk, _ in fragments],
+            'delays': [delay for _, delay in fragments],
+        })
+
+    def dump(self, path: str) -> int:
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                for entry in self.entries:
+                    f.write(json.dumps(entry) + '\n')
+        except OSError as e:
+            logger.error(f"Cannot write chaos trace {path}: {e}")
+            return 0
+
+        logger.info(f"📝 Chaos trace: {len(self.entries)} plans written to {path}")
+        return len(self.entries)
+
+    @staticmethod
+    def load(path: str) -> list:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
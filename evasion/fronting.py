@@ -1,18 +1,60 @@
+import asyncio
 import json
 import logging
 import random
+import time
 from typing import Optional, List
 
 logger = logging.getLogger('CTE.Fronting')
 
+class FrontHealth:
+
+    __slots__ = ('provider', 'latency_ms', 'error_rate', 'successes', 'failures', 'resets',
+                 'streak', 'ejections', 'ejected_until')
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.latency_ms = None
+        self.error_rate = 0.0
+        self.successes = 0
+        self.failures = 0
+        self.resets = 0
+        self.streak = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+
+    def score(self, failure_penalty: float) -> float:
+        latency = self.latency_ms if self.latency_ms is not None else 0.0
+        return (latency + 1.0) * (1.0 + failure_penalty * self.error_rate)
+
 class DomainFronter:
 
-    def __init__(self, config_file: str = 'cdn_domains.json', enabled: bool = True):
+    def __init__(self, config_file: str = 'cdn_domains.json', enabled: bool = True, ewma_alpha: float = 0.2,
+                 eject_after: int = 3, eject_seconds: float = 30, max_eject_seconds: float = 300,
+                 failure_penalty: float = 4.0, probe_interval: float = 0, refresh_interval: float = 300,
+                 address_max_age: float = 900):
         self.enabled = enabled
+        self.config_file = config_file
         self.cdn_domains = {}
 
+        self.alpha = ewma_alpha
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.max_eject_seconds = max_eject_seconds
+        self.failure_penalty = failure_penalty
+        self.probe_interval = probe_interval
+        self.refresh_interval = refresh_interval
+        self.address_max_age = address_max_age
+
+        self.health = {}
+        self.addresses = {}
+        self.ejected_total = 0
+        self._dns = None
+        self._tasks = []
+
         if enabled:
             self._load_cdn_domains(config_file)
+            self._sync_health()
 
             total_domains = sum(len(domains) for domains in self.cdn_domains.values())
             logger.info(
@@ -22,6 +64,20 @@ class DomainFronter:
         else:
             logger.info("Domain Fronting: disabled")
 
+    def reload(self):
+        if self.enabled:
+            self._load_cdn_domains(self.config_file)
+            self._sync_health()
+            logger.info(f"✓ Domain Fronting reloaded: {len(self.cdn_domains)} CDNs")
+
+    def _sync_health(self):
+        health = {}
+        for provider, domains in self.cdn_domains.items():
+            for domain in domains:
+                health[domain] = self.health.get(domain) or FrontHealth(provider)
+        self.health = health
+        self.addresses = {front: pin for front, pin in self.addresses.items() if front in health}
+
     def _load_cdn_domains(self, config_file: str):
         try:
             with open(config_file, 'r', encoding='utf-8') as f:
@@ -45,6 +101,69 @@ class DomainFronter:
             'google': ['www.google.com']
         }
 
+    def address(self, front: str) -> Optional[str]:
+        pin = self.addresses.get(front)
+        if pin is not None and time.monotonic() - pin[1] < self.address_max_age:
+            return pin[0]
+        return None
+
+    def pin(self, front: str, ip: str):
+        if front in self.health:
+            self.addresses[front] = (ip, time.monotonic())
+
+    async def refresh_addresses(self):
+        fronts = list(self.health)
+        results = await asyncio.gather(*(self._dns.resolve(front) for front in fronts), return_exceptions=True)
+        pinned = 0
+        for front, ip in zip(fronts, results):
+            if isinstance(ip, str) and ip:
+                self.pin(front, ip)
+                pinned += 1
+        logger.info(f"📌 Front addresses pinned: {pinned}/{len(fronts)}")
+
+    def is_available(self, front: str) -> bool:
+        health = self.health.get(front)
+        return health is None or health.ejected_until <= time.monotonic()
+
+    def record_connect(self, front: str, latency_ms: float):
+        health = self.health.get(front)
+        if health is None:
+            return
+        if health.latency_ms is None:
+            health.latency_ms = latency_ms
+        else:
+            health.latency_ms += self.alpha * (latency_ms - health.latency_ms)
+
+    def record_success(self, front: str):
+        health = self.health.get(front)
+        if health is None:
+            return
+        health.successes += 1
+        health.error_rate -= self.alpha * health.error_rate
+        health.streak = 0
+        health.ejections = 0
+
+    def record_failure(self, front: str, reset: bool = False):
+        health = self.health.get(front)
+        if health is None:
+            return
+        health.failures += 1
+        if reset:
+            health.resets += 1
+        health.error_rate += self.alpha * (1.0 - health.error_rate)
+        health.streak += 1
+        if health.streak >= self.eject_after:
+            self._eject(front, health)
+
+    def _eject(self, front: str, health: FrontHealth):
+        duration = min(self.max_eject_seconds, self.eject_seconds * (2 ** health.ejections))
+        health.ejections += 1
+        health.streak = 0
+        health.ejected_until = time.monotonic() + duration
+        self.ejected_total += 1
+        logger.warning(f"🚫 Front ejected: {front} for {duration:.0f}s "
+                       f"(error {health.error_rate:.0%}, {health.resets} resets)")
+
     def select_front_domain(
         self,
         cdn_provider: Optional[str] = None,
@@ -54,17 +173,24 @@ class DomainFronter:
             return None
 
         if cdn_provider and cdn_provider in self.cdn_domains:
-            provider = cdn_provider
+            fronts = list(self.cdn_domains[cdn_provider])
         else:
-            provider = random.choice(list(self.cdn_domains.keys()))
-
-        domains = self.cdn_domains.get(provider, [])
-        if not domains:
+            fronts = list(self.health)
+        if not fronts:
             return None
 
-        front_domain = random.choice(domains)
+        candidates = [front for front in fronts if self.is_available(front)]
+        if not candidates:
+            front_domain = min(fronts, key=lambda f: self.health[f].ejected_until if f in self.health else 0)
+        elif len(candidates) == 1:
+            front_domain = candidates[0]
+        else:
+            a, b = random.sample(candidates, 2)
+            score = lambda f: self.health[f].score(self.failure_penalty) if f in self.health else 1.0
+            front_domain = a if score(a) <= score(b) else b
 
         if real_domain:
+            provider = self.health[front_domain].provider if front_domain in self.health else cdn_provider
             logger.info(
                 f"🎭 Domain Fronting: {real_domain} -> {front_domain} "
                 f"(via {provider})"
@@ -72,8 +198,81 @@ class DomainFronter:
 
         return front_domain
 
+    def start(self, dns_resolver=None):
+        if not self.enabled or self._tasks:
+            return
+        self._dns = dns_resolver
+        loop = asyncio.get_running_loop()
+        if dns_resolver is not None and self.refresh_interval > 0:
+            self._tasks.append(loop.create_task(self._refresh_loop()))
+        if self.probe_interval > 0:
+            self._tasks.append(loop.create_task(self._probe_loop()))
+            logger.info(f"✓ Front health probing every {self.probe_interval:.0f}s")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.refresh_addresses()
+            except Exception as e:
+                logger.error(f"Front address refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def _probe_loop(self):
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            ejected = [front for front in self.health if not self.is_available(front)]
+            if ejected:
+                await asyncio.gather(*(self._probe(front) for front in ejected), return_exceptions=True)
+
+    async def _probe(self, front: str):
+        health = self.health[front]
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            host = self.address(front) or (await self._dns.resolve(front) if self._dns is not None else None) or front
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, 443), timeout=5.0)
+            writer.close()
+        except Exception as e:
+            logger.debug(f"Front probe {front} failed: {e}")
+            self._eject(front, health)
+            return
+
+        self.record_connect(front, (loop.time() - started) * 1000)
+        health.ejected_until = 0.0
+        health.streak = self.eject_after - 1
+        logger.info(f"✓ Front re-admitted after probe: {front}")
+
+    def get_health(self) -> list:
+        now = time.monotonic()
+        fronts = [
+            {
+                'front': front,
+                'provider': health.provider,
+                'latency_ms': round(health.latency_ms, 1) if health.latency_ms is not None else None,
+                'error_rate': round(health.error_rate * 100, 1),
+                'successes': health.successes,
+                'failures': health.failures,
+                'resets': health.resets,
+                'ejected_for': round(max(0.0, health.ejected_until - now), 1),
+                'address': self.addresses[front][0] if front in self.addresses else None,
+            }
+            for front, health in self.health.items()
+        ]
+        fronts.sort(key=lambda f: (f['ejected_for'] > 0, self.health[f['front']].score(self.failure_penalty)))
+        return fronts
+
     def get_available_cdns(self) -> List[str]:
         return list(self.cdn_domains.keys())
 
     def get_cdn_domains(self, cdn_provider: str) -> List[str]:
-        return self.cdn_domains.get(cdn_provider, [])
\ No newline at end of file
+        return self.cdn_domains.get(cdn_provider, [])
@@ -1,25 +1,42 @@
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
 import asyncio
+import os
 import signal
+import socket
 import sys
 import yaml
 import logging
 from pathlib import Path
+from typing import Optional
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from core.engine import ChaosEngine
+from core.engine import ChaosEngine, ChaosEnginePool
+from core.metrics import ChaosFleetMonitor
+from core.trace import ChaosTrace
+from core.adaptive import AdaptiveFragmentController
+from core.strategy import FragmentStrategyCache, STRATEGY_AGGRESSIVE, STRATEGY_LIGHT
 from core.dns import DNSResolver
 from core.tls import TLSFragmenter
 from server.protocols import create_handlers
+from server.pool import FrontConnectionPool
+from server.routing import RoutePlanner
+from server.buffers import RelayBuffers
 from server.proxy import ProxyServer
+from server.reaper import ConnectionReaper
 from server.relay import TrafficRelay
 from evasion.fronting import DomainFronter
 from monitoring.stats import StatsCollector
 from monitoring.limiter import ConnectionLimiter
 from utils.logger import setup_logging, get_logger
 from utils.bypass import BypassManager
-from web.dashboard import WebDashboard
-from web.api import WebAPI
+from utils import loop as event_loop
+
+IMPORTED = time.perf_counter()
 
 logger = None
 
@@ -34,30 +51,51 @@ def load_config(config_file: str = 'config.yaml') -> dict:
         print(f"❌ Invalid YAML in config: {e}")
         sys.exit(1)
 
-async def main():
-    global logger
-    config = load_config('config.yaml')
+def configure_logging(config: dict):
     log_config = config.get('logging', {})
     setup_logging(
         level=log_config.get('level', 'INFO'),
         log_file=log_config.get('file'),
         console=log_config.get('console', True)
     )
+
+async def main(config: dict = None, worker_id: int = None, shared_stats=None, startup_time: bool = False):
+    global logger
+    if config is None:
+        config = load_config('config.yaml')
+    configure_logging(config)
     logger = get_logger('Main')
 
     logger.info("=" * 60)
     logger.info("🚀 Chaos Traffic Engine")
-    logger.info("Anti-Censorship Proxy")
+    logger.info("Anti-Censorship Proxy" if worker_id is None else f"Anti-Censorship Proxy - worker {worker_id}")
     logger.info("=" * 60)
 
     stats_collector = None
     proxy_server = None
+    fragment_controller = None
+    chaos_trace = None
+    strategy_cache = None
+    strategy_path = None
+    domain_fronter = None
+    front_pool = None
+    reaper = None
+    publish_task = None
+    primary = worker_id in (None, 0)
+    chaos_config = config.get('chaos', {})
 
     try:
         logger.info("Initializing components...")
+        logger.info(f"✓ Event loop: {event_loop.loop_name()}")
 
-        chaos_engine = ChaosEngine()
-        logger.info("✓ Chaos Engine initialized")
+        chaos_seed = chaos_config.get('seed')
+        if chaos_seed is not None and worker_id:
+            chaos_seed += worker_id
+        chaos_engine = ChaosEngine(seed=chaos_seed)
+        if chaos_seed is not None:
+            logger.info(f"✓ Chaos Engine initialized (deterministic seed: {chaos_seed})")
+        else:
+            logger.info("✓ Chaos Engine initialized")
 
         dns_config = config.get('dns', {})
         dns_resolver = DNSResolver(
@@ -69,38 +107,107 @@ async def main():
         
         logger.info("✓ DNS Resolver initialized")
 
-        chaos_config = config.get('chaos', {})
+        limits_config = config.get('limits', {})
+        limiter = ConnectionLimiter(
+            max_connections=limits_config.get('max_connections', 100),
+            max_queue=limits_config.get('max_queue', 256),
+            max_wait=limits_config.get('max_queue_wait', 1.0),
+            queue_target_ms=limits_config.get('queue_target_ms', 50),
+            queue_interval_ms=limits_config.get('queue_interval_ms', 500),
+            per_client_connections=limits_config.get('per_client_connections', 0),
+            client_upload_rate_kb=limits_config.get('client_upload_rate_kb', 0),
+            client_download_rate_kb=limits_config.get('client_download_rate_kb', 0),
+            client_burst_kb=limits_config.get('client_burst_kb', 256)
+        )
+        
+        logger.info("✓ Connection Limiter initialized")
+
+        adaptive_config = chaos_config.get('adaptive', {})
+        fragment_controller = AdaptiveFragmentController(
+            limiter=limiter,
+            enabled=adaptive_config.get('enabled', True),
+            min_level=adaptive_config.get('min_level', 0.25),
+            min_jitter_scale=adaptive_config.get('min_jitter_scale', 0.2),
+            high_watermark=adaptive_config.get('high_watermark', 0.8),
+            low_watermark=adaptive_config.get('low_watermark', 0.5),
+            lag_target_ms=adaptive_config.get('lag_target_ms', 50),
+            pending_target=adaptive_config.get('pending_target', 200),
+            interval=adaptive_config.get('interval', 0.5)
+        )
+
+        logger.info("✓ Adaptive Fragment Controller initialized")
+
+        chaos_monitor = ChaosFleetMonitor(
+            sample_every=chaos_config.get('metrics_sample_every', 8)
+        )
+
+        trace_file = chaos_config.get('trace_file')
+        if trace_file and worker_id is not None:
+            trace_file = f"{trace_file}.{worker_id}"
+        if trace_file:
+            chaos_trace = ChaosTrace(max_entries=chaos_config.get('trace_max_entries', 10000))
+
+        strategy_cache = build_strategy_cache(chaos_config)
+        if strategy_cache is not None:
+            if worker_id is None and not startup_time:
+                strategy_cache.consolidate()
+            if strategy_cache.path:
+                strategy_path = strategy_cache.path if worker_id is None else f"{strategy_cache.path}.{worker_id}"
+            logger.info("✓ Fragment Strategy Cache initialized")
+
         tls_fragmenter = TLSFragmenter(
             chaos_engine,
-            aggressive=chaos_config.get('aggressive', True)
+            aggressive=chaos_config.get('aggressive', True),
+            sni_aware=chaos_config.get('sni_aware', True),
+            monitor=chaos_monitor,
+            trace=chaos_trace,
+            controller=fragment_controller if fragment_controller.enabled else None,
+            strategies=strategy_cache
         )
         
         logger.info("✓ TLS Fragmenter initialized")
 
+        engine_pool = ChaosEnginePool(
+            max_size=chaos_config.get('engine_pool_size', 64),
+            monitor=chaos_monitor,
+            seed=chaos_seed
+        )
+
+        logger.info("✓ Chaos Engine Pool initialized")
+
         evasion_config = config.get('evasion', {})
+        front_health_config = evasion_config.get('front_health', {})
         domain_fronter = DomainFronter(
             config_file='config/' + evasion_config.get('cdn_domains_file', 'cdn_domains.json'),
-            enabled=evasion_config.get('domain_fronting', True)
+            enabled=evasion_config.get('domain_fronting', True),
+            ewma_alpha=front_health_config.get('ewma_alpha', 0.2),
+            eject_after=front_health_config.get('eject_after', 3),
+            eject_seconds=front_health_config.get('eject_seconds', 30),
+            max_eject_seconds=front_health_config.get('max_eject_seconds', 300),
+            probe_interval=front_health_config.get('probe_interval', 60),
+            refresh_interval=evasion_config.get('front_refresh_interval', 300),
+            address_max_age=evasion_config.get('front_address_max_age', 900)
         )
         
         logger.info("✓ Domain Fronting initialized")
 
         bypass_config = config.get('bypass', {})
+        geodata_file = bypass_config.get('geodata_file')
         bypass_manager = BypassManager(
-            config_file='config/' + bypass_config.get('iranian_domains_file', 'iranian_domains.json')
+            config_file='config/' + bypass_config.get('iranian_domains_file', 'iranian_domains.json'),
+            geodata_file='config/' + geodata_file if geodata_file else None
         )
         
         logger.info("✓ Bypass Manager initialized")
 
-        stats_collector = StatsCollector()
+        stats_collector = StatsCollector(shared=shared_stats, worker_id=worker_id or 0)
         logger.info("✓ Stats Collector initialized")
 
-        limits_config = config.get('limits', {})
-        limiter = ConnectionLimiter(
-            max_connections=limits_config.get('max_connections', 100)
+        reaper = ConnectionReaper(
+            idle_timeout=limits_config.get('idle_timeout', 60),
+            connection_timeout=limits_config.get('connection_timeout', 0),
+            stats=stats_collector
         )
-        
-        logger.info("✓ Connection Limiter initialized")
 
         buffers_config = config.get('buffers', {})
         traffic_relay = TrafficRelay(
@@ -112,13 +219,49 @@ async def main():
         
         logger.info("✓ Traffic Relay initialized")
 
+        performance_config = config.get('performance', {})
+        route_planner = RoutePlanner(
+            dns_resolver,
+            bypass_manager,
+            domain_fronter,
+            max_entries=performance_config.get('route_cache_size', 4096),
+            ttl=performance_config.get('route_cache_ttl', 300)
+        )
+
+        logger.info("✓ Route Planner initialized")
+
+        front_pool_config = performance_config.get('front_pool', {})
+        if front_pool_config.get('enabled', False) and domain_fronter.enabled:
+            front_pool = FrontConnectionPool(
+                max_size=front_pool_config.get('max_size', 50),
+                per_target=front_pool_config.get('per_front', 2),
+                hot_targets=front_pool_config.get('hot_fronts', 4),
+                idle_timeout=front_pool_config.get('idle_timeout', 10)
+            )
+
+        relay_buffers = RelayBuffers(
+            min_size=buffers_config.get('small', 8192),
+            start_size=buffers_config.get('medium', 65536),
+            max_size=buffers_config.get('large', 262144),
+            budget_mb=buffers_config.get('relay_budget_mb', 64)
+        )
+
+        retry_config = chaos_config.get('retry', {})
         handlers = create_handlers(
             chaos_engine,
             dns_resolver,
             bypass_manager,
             stats_collector,
             tls_fragmenter,
-            domain_fronter
+            domain_fronter,
+            engine_pool,
+            max_retries=retry_config.get('max_attempts', 2),
+            retry_window_ms=retry_config.get('window_ms', 3000),
+            route_planner=route_planner,
+            front_pool=front_pool,
+            limiter=limiter,
+            reaper=reaper,
+            relay_buffers=relay_buffers
         )
         
         logger.info(f"✓ {len(handlers)} Protocol Handlers initialized")
@@ -130,29 +273,45 @@ async def main():
             handlers=handlers,
             limiter=limiter,
             stats_collector=stats_collector,
-            buffers=buffers_config
+            buffers=buffers_config,
+            reuse_port=worker_id is not None,
+            on_listen=lambda: listening(proxy_server, startup_time)
         )
         
         logger.info("✓ Proxy Server initialized")
 
         web_config = config.get('web', {})
-        web_dashboard = WebDashboard(
-            stats_collector=stats_collector,
-            chaos_engine=chaos_engine,
-            dns_resolver=dns_resolver,
-            proxy_server=proxy_server,
-            port=web_config.get('port', 8080),
-            enabled=web_config.get('enabled', True)
-        )
-        
-        web_api = WebAPI(
-            stats_collector=stats_collector,
-            chaos_engine=chaos_engine,
-            dns_resolver=dns_resolver,
-            proxy_server=proxy_server
-        )
-        
-        if web_config.get('enabled', True):
+        if web_config.get('enabled', True) and primary and not startup_time:
+            from web.dashboard import WebDashboard
+            from web.api import WebAPI
+
+            web_dashboard = WebDashboard(
+                stats_collector=stats_collector,
+                chaos_engine=chaos_engine,
+                dns_resolver=dns_resolver,
+                proxy_server=proxy_server,
+                chaos_monitor=chaos_monitor,
+                fragment_controller=fragment_controller,
+                strategy_cache=strategy_cache,
+                domain_fronter=domain_fronter,
+                port=web_config.get('port', 8080),
+                enabled=True
+            )
+
+            web_api = WebAPI(
+                stats_collector=stats_collector,
+                chaos_engine=chaos_engine,
+                dns_resolver=dns_resolver,
+                proxy_server=proxy_server,
+                chaos_monitor=chaos_monitor,
+                fragment_controller=fragment_controller,
+                strategy_cache=strategy_cache,
+                route_planner=route_planner,
+                domain_fronter=domain_fronter,
+                front_pool=front_pool,
+                relay_buffers=relay_buffers
+            )
+
             await web_dashboard.start(web_api=web_api)
 
         logger.info("=" * 60)
@@ -170,10 +329,27 @@ async def main():
             logger.info(f"\n📊 Received signal {sig}, shutting down...")
             loop.create_task(proxy_server.stop())
 
+        def reload_handler():
+            logger.info("🔄 Received SIGHUP, reloading routing config...")
+            bypass_manager.reload()
+            domain_fronter.reload()
+            route_planner.invalidate()
+
         import platform
         if platform.system() != 'Windows':
             for sig in (signal.SIGTERM, signal.SIGINT):
                 loop.add_signal_handler(sig, lambda s=sig: signal_handler(s))
+            loop.add_signal_handler(signal.SIGHUP, reload_handler)
+
+        fragment_controller.start()
+        reaper.start()
+        domain_fronter.start(dns_resolver)
+        if front_pool is not None:
+            front_pool.start()
+        if strategy_cache is not None and not startup_time:
+            strategy_cache.start(strategy_path)
+        if shared_stats is not None:
+            publish_task = loop.create_task(shared_stats.publish_loop(worker_id, stats_collector))
 
         await proxy_server.start()
 
@@ -185,20 +361,92 @@ async def main():
         logger.error(f"❌ Fatal error: {e}", exc_info=True)
         return 1
     finally:
+        if fragment_controller is not None:
+            await fragment_controller.stop()
+        if domain_fronter is not None:
+            await domain_fronter.stop()
+        if reaper is not None:
+            await reaper.stop()
+        if front_pool is not None:
+            await front_pool.stop()
+        if strategy_cache is not None:
+            await strategy_cache.stop()
+        if publish_task is not None:
+            publish_task.cancel()
+            shared_stats.publish(worker_id, stats_collector)
         if logger:
             logger.info("=" * 60)
             logger.info("📊 Final Statistics:")
             logger.info("=" * 60)
-            if stats_collector:
+            if stats_collector and primary:
                 await stats_collector.print_summary()
+            if chaos_trace is not None:
+                chaos_trace.dump(trace_file)
+            if strategy_cache is not None and strategy_cache.path and not startup_time:
+                strategy_cache.save(strategy_path)
             logger.info("=" * 60)
             logger.info("👋 Chaos Traffic Engine stopped")
             logger.info("=" * 60)
     return 0
 
+def build_strategy_cache(chaos_config: dict) -> Optional[FragmentStrategyCache]:
+    strategy_config = chaos_config.get('strategy_cache', {})
+    if not strategy_config.get('enabled', True):
+        return None
+    return FragmentStrategyCache(
+        default_level=STRATEGY_AGGRESSIVE if chaos_config.get('aggressive', True) else STRATEGY_LIGHT,
+        max_entries=strategy_config.get('max_entries', 4096),
+        path=strategy_config.get('file'),
+        probe_window_ms=strategy_config.get('probe_window_ms', 60000),
+        promote_after=strategy_config.get('promote_after', 5),
+        save_interval=strategy_config.get('save_interval', 60)
+    )
+
+def listening(proxy_server: ProxyServer, startup_time: bool):
+    now = time.perf_counter()
+    logger.info(f"⏱️  Time to listen: {(now - STARTED) * 1000:.0f} ms "
+                f"(imports {(IMPORTED - STARTED) * 1000:.0f} ms, init {(now - IMPORTED) * 1000:.0f} ms)")
+    if startup_time:
+        asyncio.get_running_loop().create_task(proxy_server.stop())
+
+def run(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Chaos Traffic Engine')
+    parser.add_argument('--config', default='config.yaml', help='config file (default: config.yaml)')
+    parser.add_argument('--startup-time', action='store_true',
+                        help='report time-to-listen and exit as soon as the proxy accepts connections')
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    configure_logging(config)
+    workers = config.get('server', {}).get('workers', 1)
+    loop = event_loop.resolve_loop(config.get('performance', {}).get('event_loop', 'auto'))
+
+    if args.startup_time:
+        return event_loop.run(main(config, startup_time=True), loop)
+
+    if workers > 1:
+        if hasattr(os, 'fork') and hasattr(socket, 'SO_REUSEPORT'):
+            from monitoring.shared import SharedStats
+            from server.workers import WorkerSupervisor
+
+            strategy_cache = build_strategy_cache(config.get('chaos', {}))
+            if strategy_cache is not None:
+                strategy_cache.consolidate()
+
+            shared_stats = SharedStats(workers)
+            supervisor = WorkerSupervisor(
+                workers,
+                lambda worker_id: event_loop.run(main(config, worker_id, shared_stats), loop),
+                shared_stats
+            )
+            return supervisor.run()
+        print(f"⚠️  workers: {workers} needs fork + SO_REUSEPORT, running a single process")
+
+    return event_loop.run(main(config), loop)
+
 if __name__ == '__main__':
     try:
-        exit_code = asyncio.run(main())
+        exit_code = run()
         sys.exit(exit_code)
     except KeyboardInterrupt:
         print("\n⚠️  Interrupted by user")
@@ -1,57 +1,253 @@
 import asyncio
 import logging
+import math
+import time
+from collections import deque
 from typing import Optional
 
 logger = logging.getLogger('CTE.Limiter')
 
+PRIORITY_HANDSHAKE = 0
+PRIORITY_NEW = 1
+
+class TokenBucket:
+
+    __slots__ = ('rate', 'burst', 'tokens', 'stamp', 'quantum', 'throttled', 'throttled_seconds')
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = time.monotonic()
+        self.quantum = max(4096, min(burst, rate / 50))
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+
+    def take(self, n: int) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate) - n
+        self.stamp = now
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    async def pace(self, n: int):
+        delay = self.take(n)
+        if delay > 0:
+            self.throttled += 1
+            self.throttled_seconds += delay
+            await asyncio.sleep(delay)
+
+class ClientState:
+
+    __slots__ = ('connections', 'upload', 'download')
+
+    def __init__(self, upload: Optional[TokenBucket], download: Optional[TokenBucket]):
+        self.connections = 0
+        self.upload = upload
+        self.download = download
+
 class ConnectionLimiter:
 
-    def __init__(self, max_connections: int = 100):
+    def __init__(self, max_connections: int = 100, max_queue: int = 256, max_wait: float = 1.0,
+                 queue_target_ms: float = 50, queue_interval_ms: float = 500, per_client_connections: int = 0,
+                 client_upload_rate_kb: float = 0, client_download_rate_kb: float = 0, client_burst_kb: float = 256):
         self.max_connections = max_connections
-        self.semaphore = asyncio.Semaphore(max_connections)
-        self._lock = asyncio.Lock()
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.target = queue_target_ms / 1000
+        self.interval = queue_interval_ms / 1000
+
         self.current_connections = 0
+        self.admitted_total = 0
+        self.queued_total = 0
         self.rejected_total = 0
+        self.shed_queue_full = 0
+        self.shed_codel = 0
+        self.shed_timeout = 0
+        self.shed_client_quota = 0
 
-        logger.info(f"✓ Connection limit: {max_connections}")
+        self.per_client_connections = per_client_connections
+        self.upload_rate = client_upload_rate_kb * 1024
+        self.download_rate = client_download_rate_kb * 1024
+        self.client_burst = max(client_burst_kb * 1024, 65536)
+        self.clients = {}
+        self.throttled = 0
+        self.throttled_seconds = 0.0
 
-    async def acquire(self, timeout: Optional[float] = None) -> bool:
-        try:
-            if timeout:
-                await asyncio.wait_for(
-                    self.semaphore.acquire(),
-                    timeout=timeout
-                )
-            else:
-                await self.semaphore.acquire()
+        self.queue_delay_ms = 0.0
+        self.queue_delay_max_ms = 0.0
+        self.overloaded = False
+        self._queues = (deque(), deque())
+        self._waiting = 0
+        self._first_above = None
+        self._drops = 0
+        self._drop_next = 0.0
+
+        logger.info(f"✓ Connection limit: {max_connections} (queue {max_queue}, target {queue_target_ms:.0f}ms)")
+        if per_client_connections or self.upload_rate or self.download_rate:
+            logger.info(f"✓ Per-client limits: {per_client_connections or '∞'} connections, "
+                        f"↑ {client_upload_rate_kb or '∞'} KB/s, ↓ {client_download_rate_kb or '∞'} KB/s")
 
-            async with self._lock:
-                self.current_connections += 1
-            logger.debug(f"Connection accepted ({self.current_connections}/{self.max_connections})")
+    def _observe(self, delay: float, now: float) -> bool:
+        self.queue_delay_ms += (delay * 1000 - self.queue_delay_ms) * 0.1
+        self.queue_delay_max_ms = max(self.queue_delay_max_ms, delay * 1000)
+
+        if delay < self.target:
+            self._first_above = None
+            if self.overloaded:
+                self._set_overloaded(False, delay)
+            return False
+        if self._first_above is None:
+            self._first_above = now + self.interval
+            return False
+        if not self.overloaded:
+            if now < self._first_above:
+                return False
+            self._set_overloaded(True, delay)
+            self._drops = 1
+            self._drop_next = now + self.interval
             return True
+        if now < self._drop_next:
+            return False
+        self._drops += 1
+        self._drop_next += self.interval / math.sqrt(self._drops)
+        return True
+
+    def _set_overloaded(self, overloaded: bool, delay: float):
+        self.overloaded = overloaded
+        if not overloaded:
+            self._first_above = None
+        log = logger.warning if overloaded else logger.info
+        log(f"🚦 Admission queue {'overloaded' if overloaded else 'recovered'} "
+            f"(queue delay {delay * 1000:.0f}ms, {self._waiting} waiting)")
+
+    def _shed(self, reason: str):
+        self.rejected_total += 1
+        logger.debug(f"Connection shed ({reason}) - "
+                     f"active {self.current_connections}/{self.max_connections}, {self._waiting} waiting")
 
-        except asyncio.TimeoutError:
-            async with self._lock:
-                self.rejected_total += 1
-            logger.warning(
-                f"Connection rejected (timeout) - "
-                f"Active connections: {self.current_connections}/{self.max_connections}"
-            )
+    def _bucket(self, rate: float) -> Optional[TokenBucket]:
+        return TokenBucket(rate, max(self.client_burst, rate / 10)) if rate else None
+
+    def _leave(self, client: str):
+        state = self.clients[client]
+        state.connections -= 1
+        if state.connections <= 0:
+            del self.clients[client]
+            for bucket in (state.upload, state.download):
+                if bucket is not None:
+                    self.throttled += bucket.throttled
+                    self.throttled_seconds += bucket.throttled_seconds
+
+    def buckets(self, client: Optional[str]) -> tuple:
+        state = self.clients.get(client)
+        if state is None:
+            return None, None
+        return state.upload, state.download
+
+    async def acquire(self, priority: int = PRIORITY_NEW, timeout: Optional[float] = None,
+                      client: Optional[str] = None) -> bool:
+        if client is None:
+            return await self._admit(priority, timeout)
+
+        state = self.clients.get(client)
+        if state is None:
+            state = self.clients[client] = ClientState(self._bucket(self.upload_rate), self._bucket(self.download_rate))
+        if self.per_client_connections and state.connections >= self.per_client_connections:
+            self.shed_client_quota += 1
+            self._shed(f'client quota {client}')
             return False
-        except Exception as e:
-            async with self._lock:
-                self.rejected_total += 1
-            logger.error(f"  acquire: {e}")
+
+        state.connections += 1
+        admitted = False
+        try:
+            admitted = await self._admit(priority, timeout)
+        finally:
+            if not admitted:
+                self._leave(client)
+        return admitted
+
+    async def _admit(self, priority: int, timeout: Optional[float]) -> bool:
+        if self.current_connections < self.max_connections and not self._waiting:
+            self.current_connections += 1
+            self.admitted_total += 1
+            if self.overloaded:
+                self._set_overloaded(False, 0.0)
+            return True
+
+        if self._waiting >= self.max_queue:
+            self.shed_queue_full += 1
+            self._shed('queue full')
             return False
 
-    async def release(self):
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        entry = (waiter, time.monotonic())
+        self._queues[priority].append(entry)
+        self._waiting += 1
+        self.queued_total += 1
+
+        expiry = loop.call_later(timeout or self.max_wait, self._expire, entry)
         try:
-            self.semaphore.release()
-            async with self._lock:
-                self.current_connections -= 1
-            logger.debug(f"Connection released ({self.current_connections}/{self.max_connections})")
-        except Exception as e:
-            logger.error(f"  release: {e}")
+            admitted = await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and waiter.result():
+                self.release()
+            else:
+                self._discard(entry)
+            raise
+        finally:
+            expiry.cancel()
+
+        return admitted
+
+    def _discard(self, entry: tuple):
+        for queue in self._queues:
+            try:
+                queue.remove(entry)
+            except ValueError:
+                continue
+            self._waiting -= 1
+            return
+
+    def _expire(self, entry: tuple):
+        waiter, enqueued = entry
+        if waiter.done():
+            return
+        self._discard(entry)
+        now = time.monotonic()
+        self._observe(now - enqueued, now)
+        self.shed_timeout += 1
+        self._shed('timeout')
+        waiter.set_result(False)
+
+    def _next_waiter(self):
+        now = time.monotonic()
+        for queue in self._queues:
+            while queue:
+                waiter, enqueued = queue.popleft()
+                self._waiting -= 1
+                if waiter.done():
+                    continue
+                if self._observe(now - enqueued, now):
+                    self.shed_codel += 1
+                    self._shed('codel')
+                    waiter.set_result(False)
+                    continue
+                return waiter
+        return None
+
+    def release(self, client: Optional[str] = None):
+        if client is not None:
+            self._leave(client)
+        waiter = self._next_waiter()
+        if waiter is not None:
+            self.admitted_total += 1
+            waiter.set_result(True)
+            return
+        if self.overloaded:
+            self._set_overloaded(False, 0.0)
+        self.current_connections -= 1
+        logger.debug(f"Connection released ({self.current_connections}/{self.max_connections})")
 
     def is_available(self) -> bool:
         return self.current_connections < self.max_connections
@@ -61,16 +257,48 @@ class ConnectionLimiter:
             'max_connections': self.max_connections,
             'current_connections': self.current_connections,
             'available_slots': self.max_connections - self.current_connections,
+            'utilization_percent': (self.current_connections / self.max_connections) * 100,
+            'waiting': self._waiting,
+            'waiting_handshake': len(self._queues[PRIORITY_HANDSHAKE]),
+            'admitted_total': self.admitted_total,
+            'queued_total': self.queued_total,
             'rejected_total': self.rejected_total,
-            'utilization_percent': (self.current_connections / self.max_connections) * 100
+            'shed_queue_full': self.shed_queue_full,
+            'shed_codel': self.shed_codel,
+            'shed_timeout': self.shed_timeout,
+            'shed_client_quota': self.shed_client_quota,
+            'clients': len(self.clients),
+            'throttled': self.throttled + sum(b.throttled for b in self._live_buckets()),
+            'throttled_seconds': self.throttled_seconds + sum(b.throttled_seconds for b in self._live_buckets()),
+            'queue_delay_ms': self.queue_delay_ms,
+            'queue_delay_max_ms': self.queue_delay_max_ms,
+            'overloaded': self.overloaded,
         }
 
+    def _live_buckets(self):
+        for state in self.clients.values():
+            for bucket in (state.upload, state.download):
+                if bucket is not None:
+                    yield bucket
+
+    def get_clients(self, limit: int = 20) -> list:
+        top = sorted(self.clients.items(), key=lambda item: item[1].connections, reverse=True)[:limit]
+        return [
+            {
+                'client': client,
+                'connections': state.connections,
+                'upload_throttled_s': state.upload.throttled_seconds if state.upload else 0.0,
+                'download_throttled_s': state.download.throttled_seconds if state.download else 0.0,
+            }
+            for client, state in top
+        ]
+
     async def __aenter__(self):
         await self.acquire()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.release()
+        self.release()
 
 class MaxConnectionError(Exception):
-    pass
\ No newline at end of file
+    pass
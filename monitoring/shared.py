@@ -0,0 +1,44 @@
+import asyncio
+import mmap
+
+import numpy as np
+
+COUNTERS = (
+    'connections_active', 'connections_total', 'connections_success', 'connections_failed',
+    'bytes_sent_total', 'bytes_received_total', 'bypassed_total', 'tunneled_total',
+    'retry_attempts', 'retry_recovered', 'retry_exhausted', 'reaped_idle', 'reaped_lifetime', 'retry_cost_us',
+)
+PROTOCOLS = ('HTTP', 'SOCKS5', 'WebSocket')
+FIELDS = COUNTERS + tuple(f'protocol_{name}' for name in PROTOCOLS)
+
+class SharedStats:
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        rows = workers + 1
+        self._mm = mmap.mmap(-1, rows * len(FIELDS) * 8)
+        self.slots = np.frombuffer(self._mm, dtype=np.int64).reshape(rows, len(FIELDS))
+
+    @staticmethod
+    def snapshot(collector) -> list:
+        values = [getattr(collector, name) for name in COUNTERS[:-1]]
+        values.append(int(collector.retry_cost_ms * 1000))
+        values.extend(collector.protocol_counts.get(name, 0) for name in PROTOCOLS)
+        return values
+
+    def publish(self, worker_id: int, collector):
+        self.slots[worker_id] = self.snapshot(collector)
+
+    def retire(self, worker_id: int):
+        retired = self.slots[worker_id].copy()
+        retired[FIELDS.index('connections_active')] = 0
+        self.slots[self.workers] += retired
+        self.slots[worker_id] = 0
+
+    def totals(self) -> dict:
+        return dict(zip(FIELDS, (int(v) for v in self.slots.sum(axis=0))))
+
+    async def publish_loop(self, worker_id: int, collector, interval: float = 1.0):
+        while True:
+            self.publish(worker_id, collector)
+            await asyncio.sleep(interval)
@@ -18,8 +18,10 @@ class ConnectionStats:
 
 class StatsCollector:
 
-    def __init__(self):
+    def __init__(self, shared=None, worker_id: int = 0):
         self.lock = asyncio.Lock()
+        self.shared = shared
+        self.worker_id = worker_id
 
         self.start_time = time.time()
         self.connections_active = 0
@@ -33,6 +35,14 @@ class StatsCollector:
         self.bypassed_total = 0
         self.tunneled_total = 0
 
+        self.retry_attempts = 0
+        self.retry_recovered = 0
+        self.retry_exhausted = 0
+        self.retry_cost_ms = 0.0
+
+        self.reaped_idle = 0
+        self.reaped_lifetime = 0
+
         self.protocol_counts: Dict[str, int] = {}
 
         self.active_connections: Dict[str, ConnectionStats] = {}
@@ -99,34 +109,80 @@ class StatsCollector:
         async with self.lock:
             self.tunneled_total += 1
 
+    async def record_retry(self, attempts: int, recovered: bool, cost_ms: float):
+        async with self.lock:
+            self.retry_attempts += attempts
+            self.retry_cost_ms += cost_ms
+            if recovered:
+                self.retry_recovered += 1
+            else:
+                self.retry_exhausted += 1
+
+    async def record_reaped(self, idle: int, lifetime: int):
+        async with self.lock:
+            self.reaped_idle += idle
+            self.reaped_lifetime += lifetime
+
+    def _counters(self) -> dict:
+        if self.shared is None:
+            counters = {name: getattr(self, name) for name in (
+                'connections_active', 'connections_total', 'connections_success', 'connections_failed',
+                'bytes_sent_total', 'bytes_received_total', 'bypassed_total', 'tunneled_total',
+                'retry_attempts', 'retry_recovered', 'retry_exhausted', 'reaped_idle', 'reaped_lifetime',
+            )}
+            counters['retry_cost_ms'] = self.retry_cost_ms
+            counters['protocols'] = dict(self.protocol_counts)
+            return counters
+
+        self.shared.publish(self.worker_id, self)
+        counters = self.shared.totals()
+        counters['retry_cost_ms'] = counters.pop('retry_cost_us') / 1000
+        protocols = {name[len('protocol_'):]: counters.pop(name) for name in list(counters) if name.startswith('protocol_')}
+        counters['protocols'] = {name: count for name, count in protocols.items() if count}
+        return counters
+
     async def get_summary(self) -> dict:
         async with self.lock:
             uptime = time.time() - self.start_time
+            c = self._counters()
+            finished = c['retry_recovered'] + c['retry_exhausted']
 
             return {
                 'uptime_seconds': uptime,
                 'uptime_formatted': self._format_uptime(uptime),
+                'workers': self.shared.workers if self.shared is not None else 1,
                 'connections': {
-                    'active': self.connections_active,
-                    'total': self.connections_total,
-                    'success': self.connections_success,
-                    'failed': self.connections_failed,
+                    'active': c['connections_active'],
+                    'total': c['connections_total'],
+                    'success': c['connections_success'],
+                    'failed': c['connections_failed'],
                 },
                 'traffic': {
-                    'sent': self.bytes_sent_total,
-                    'sent_formatted': self._format_bytes(self.bytes_sent_total),
-                    'received': self.bytes_received_total,
-                    'received_formatted': self._format_bytes(self.bytes_received_total),
-                    'total': self.bytes_sent_total + self.bytes_received_total,
+                    'sent': c['bytes_sent_total'],
+                    'sent_formatted': self._format_bytes(c['bytes_sent_total']),
+                    'received': c['bytes_received_total'],
+                    'received_formatted': self._format_bytes(c['bytes_received_total']),
+                    'total': c['bytes_sent_total'] + c['bytes_received_total'],
                     'total_formatted': self._format_bytes(
-                        self.bytes_sent_total + self.bytes_received_total
+                        c['bytes_sent_total'] + c['bytes_received_total']
                     ),
                 },
                 'routing': {
-                    'bypassed': self.bypassed_total,
-                    'tunneled': self.tunneled_total,
+                    'bypassed': c['bypassed_total'],
+                    'tunneled': c['tunneled_total'],
                 },
-                'protocols': dict(self.protocol_counts),
+                'retries': {
+                    'attempts': c['retry_attempts'],
+                    'recovered': c['retry_recovered'],
+                    'exhausted': c['retry_exhausted'],
+                    'cost_ms_total': c['retry_cost_ms'],
+                    'cost_ms_avg': c['retry_cost_ms'] / finished if finished else 0.0,
+                },
+                'reaped': {
+                    'idle': c['reaped_idle'],
+                    'lifetime': c['reaped_lifetime'],
+                },
+                'protocols': c['protocols'],
             }
 
     async def print_summary(self):
@@ -152,6 +208,16 @@ class StatsCollector:
         print(f"   • bypassed: {stats['routing']['bypassed']}")
         print(f"   • tunneled: {stats['routing']['tunneled']}")
         print()
+        print(f"🔁 Retries:")
+        print(f"   • attempts: {stats['retries']['attempts']}")
+        print(f"   • recovered: {stats['retries']['recovered']}")
+        print(f"   • exhausted: {stats['retries']['exhausted']}")
+        print(f"   • avg cost: {stats['retries']['cost_ms_avg']:.0f} ms")
+        print()
+        print(f"🧹 Reaped:")
+        print(f"   • idle: {stats['reaped']['idle']}")
+        print(f"   • lifetime: {stats['reaped']['lifetime']}")
+        print()
         if stats['protocols']:
             print(f"🔧 total‌:")
             for proto, count in stats['protocols'].items():
@@ -188,6 +254,7 @@ class StatsCollector:
         summary = await self.get_summary()
         return {
             'uptime': summary['uptime_seconds'],
+            'workers': summary['workers'],
             'connections': summary['connections'],
             'traffic': {
                 'sent': summary['traffic']['sent'],
@@ -195,5 +262,7 @@ class StatsCollector:
                 'total': summary['traffic']['total']
             },
             'routing': summary['routing'],
+            'retries': summary['retries'],
+            'reaped': summary['reaped'],
             'protocols': summary['protocols']
         }
\ No newline at end of file
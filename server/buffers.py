@@ -0,0 +1,114 @@
+import logging
+
+logger = logging.getLogger('CTE.Buffers')
+
+class FlowSizer:
+
+    __slots__ = ('pool', 'conn', 'reader', 'writer', 'size', 'sparse')
+
+    SPARSE_READS = 4
+
+    def __init__(self, pool, conn: int, reader, writer, size: int):
+        self.pool = pool
+        self.conn = conn
+        self.reader = reader
+        self.writer = writer
+        self.size = size
+        self.sparse = 0
+        self._apply()
+
+    def _apply(self):
+        self.reader._limit = self.size
+        if self.reader._paused and len(self.reader._buffer) <= self.size:
+            self.reader._maybe_resume_transport()
+        transport = self.writer.transport
+        if not transport.is_closing():
+            transport.set_write_buffer_limits(high=self.size)
+
+    def update(self, n: int):
+        if n >= self.size:
+            self.sparse = 0
+            if self.size < self.pool.max_size:
+                self.pool.resize(self, self.size * 2)
+        elif n < self.size >> 2:
+            self.sparse += 1
+            if self.sparse >= self.SPARSE_READS and self.size > self.pool.min_size:
+                self.sparse = 0
+                self.pool.resize(self, self.size // 2)
+        else:
+            self.sparse = 0
+
+    def footprint(self) -> int:
+        return len(self.reader._buffer) + self.writer.transport.get_write_buffer_size()
+
+    def close(self):
+        self.pool.release(self)
+
+class RelayBuffers:
+
+    # reader pauses the socket at 2x its limit, writer drains above its high-water mark
+    BOUND = 3
+
+    def __init__(self, min_size: int = 8192, start_size: int = 65536, max_size: int = 262144, budget_mb: float = 64):
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size)
+        self.start_size = min(self.max_size, max(start_size, min_size))
+        self.budget = int(budget_mb * 1024 * 1024)
+
+        self.flows = set()
+        self.reserved = 0
+        self.grows = 0
+        self.shrinks = 0
+        self.denied = 0
+
+    def flow(self, conn, reader, writer) -> FlowSizer:
+        size = self.start_size
+        if self.reserved + size * self.BOUND > self.budget:
+            size = self.min_size
+        sizer = FlowSizer(self, id(conn), reader, writer, size)
+        self.flows.add(sizer)
+        self.reserved += size * self.BOUND
+        return sizer
+
+    def resize(self, sizer: FlowSizer, size: int):
+        size = min(self.max_size, max(self.min_size, size))
+        delta = (size - sizer.size) * self.BOUND
+        if delta > 0 and self.reserved + delta > self.budget:
+            self.denied += 1
+            return
+        if delta > 0:
+            self.grows += 1
+        else:
+            self.shrinks += 1
+        self.reserved += delta
+        sizer.size = size
+        sizer._apply()
+
+    def release(self, sizer: FlowSizer):
+        if sizer in self.flows:
+            self.flows.discard(sizer)
+            self.reserved -= sizer.size * self.BOUND
+
+    def get_stats(self) -> dict:
+        connections = {}
+        for sizer in self.flows:
+            try:
+                footprint = sizer.footprint()
+            except Exception:
+                continue
+            connections[sizer.conn] = connections.get(sizer.conn, 0) + footprint
+
+        buffered = sum(connections.values())
+        return {
+            'connections': len(connections),
+            'flows': len(self.flows),
+            'buffered': buffered,
+            'per_connection': buffered / len(connections) if connections else 0,
+            'max_connection': max(connections.values(), default=0),
+            'avg_flow_size': sum(sizer.size for sizer in self.flows) / len(self.flows) if self.flows else 0,
+            'reserved': self.reserved,
+            'budget': self.budget,
+            'grows': self.grows,
+            'shrinks': self.shrinks,
+            'denied': self.denied,
+        }
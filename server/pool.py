@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from collections import Counter, deque
+from typing import Optional, Tuple
+
+logger = logging.getLogger('CTE.Pool')
+
+class FrontConnectionPool:
+
+    def __init__(self, max_size: int = 50, per_target: int = 2, hot_targets: int = 4, idle_timeout: float = 10,
+                 interval: float = 2, connect_timeout: float = 5, demand_halflife: float = 60):
+        self.max_size = max_size
+        self.per_target = per_target
+        self.hot_targets = hot_targets
+        self.idle_timeout = idle_timeout
+        self.interval = interval
+        self.connect_timeout = connect_timeout
+        self.demand_halflife = demand_halflife
+
+        self.idle = {}
+        self.demand = Counter()
+        self.filling = set()
+        self._fills = set()
+        self.connecting = 0
+        self.hits = 0
+        self.misses = 0
+        self.created = 0
+        self.expired = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return sum(len(conns) for conns in self.idle.values())
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"✓ Front connection pool: {self.per_target} warm sockets x {self.hot_targets} fronts "
+                    f"(max {self.max_size}, idle {self.idle_timeout:.0f}s)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._fills):
+            task.cancel()
+        for conns in self.idle.values():
+            for _, writer, _ in conns:
+                writer.close()
+        self.idle.clear()
+
+    @staticmethod
+    def _alive(reader, writer) -> bool:
+        return not writer.is_closing() and not reader.at_eof()
+
+    def acquire(self, ip: str, port: int) -> Optional[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]:
+        key = (ip, port)
+        self.demand[key] += 1
+        conns = self.idle.get(key)
+        now = asyncio.get_running_loop().time()
+
+        while conns:
+            reader, writer, created = conns.pop()
+            if now - created < self.idle_timeout and self._alive(reader, writer):
+                self.hits += 1
+                self._fill_soon(key)
+                return reader, writer
+            writer.close()
+            self.expired += 1
+
+        self.misses += 1
+        self._fill_soon(key)
+        return None
+
+    def _fill_soon(self, key: tuple):
+        if self._task is not None and key in self._hot() and key not in self.filling:
+            task = asyncio.get_running_loop().create_task(self._fill(key))
+            self._fills.add(task)
+            task.add_done_callback(self._fills.discard)
+
+    def _hot(self) -> set:
+        return {key for key, _ in self.demand.most_common(self.hot_targets)}
+
+    async def _connect(self, key: tuple):
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(*key), self.connect_timeout)
+        except Exception as e:
+            logger.debug(f"Warm connect to {key[0]}:{key[1]} failed: {e}")
+            return
+        self.idle.setdefault(key, deque()).append((reader, writer, asyncio.get_running_loop().time()))
+        self.created += 1
+
+    async def _fill(self, key: tuple):
+        self.filling.add(key)
+        try:
+            missing = self.per_target - len(self.idle.setdefault(key, deque()))
+            room = self.max_size - len(self) - self.connecting
+            count = max(0, min(missing, room))
+            self.connecting += count
+            try:
+                await asyncio.gather(*(self._connect(key) for _ in range(count)))
+            finally:
+                self.connecting -= count
+        finally:
+            self.filling.discard(key)
+
+    def _evict(self, hot: set):
+        now = asyncio.get_running_loop().time()
+        for key in list(self.idle):
+            conns = self.idle[key]
+            keep = deque()
+            for reader, writer, created in conns:
+                if key in hot and now - created < self.idle_timeout and self._alive(reader, writer):
+                    keep.append((reader, writer, created))
+                else:
+                    writer.close()
+                    self.expired += 1
+            conns.clear()
+            conns.extend(keep)
+            if not conns and key not in self.filling:
+                del self.idle[key]
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        decayed = loop.time()
+        while True:
+            await asyncio.sleep(self.interval)
+            if loop.time() - decayed >= self.demand_halflife:
+                decayed = loop.time()
+                for key in list(self.demand):
+                    self.demand[key] //= 2
+                    if not self.demand[key]:
+                        del self.demand[key]
+
+            hot = self._hot()
+            self._evict(hot)
+            await asyncio.gather(*(self._fill(key) for key in hot if key not in self.filling))
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'size': len(self),
+            'max': self.max_size,
+            'targets': len(self.idle),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total * 100 if total else 0,
+            'created': self.created,
+            'expired': self.expired,
+        }
@@ -3,29 +3,227 @@ import logging
 import struct
 import base64
 import hashlib
+import ipaddress
 import uuid
 from typing import Optional, Tuple
 from urllib.parse import urlparse
 
-from core.engine import ChaosEngine
-from core.tls import TLSFragmenter
+from core.engine import CompactChaosEngine
+from core.strategy import STRATEGY_RECORDS
+from core.tls import TLSFragmenter, TLSParser
+from monitoring.limiter import PRIORITY_HANDSHAKE, PRIORITY_NEW
+from server.buffers import RelayBuffers
+from server.routing import RoutePlanner
+from server.websocket import OP_BINARY, WebSocketCodec, WebSocketError
 
 logger = logging.getLogger('CTE.Protocols')
 
 class ProtocolHandler:
-    def __init__(self, chaos_engine, dns_resolver, bypass_manager, stats_collector, tls_fragmenter=None, domain_fronter=None):
+
+    FIRST_RESPONSE_TIMEOUT = 30.0
+    ADMITS_UPSTREAM = False
+
+    def __init__(self, chaos_engine, dns_resolver, bypass_manager, stats_collector, tls_fragmenter=None, domain_fronter=None, engine_pool=None,
+                 max_retries=2, retry_window_ms=3000, route_planner=None, front_pool=None, limiter=None, reaper=None,
+                 relay_buffers=None):
         self.chaos = chaos_engine
         self.dns = dns_resolver
         self.bypass = bypass_manager
         self.stats = stats_collector
         self.tls = tls_fragmenter
         self.fronter = domain_fronter
-        self._aggressive = tls_fragmenter.aggressive if tls_fragmenter else True
+        self.engine_pool = engine_pool
+        self.max_retries = max_retries
+        self.retry_window = retry_window_ms / 1000
+        self.routes = route_planner or RoutePlanner(dns_resolver, bypass_manager, domain_fronter)
+        self.front_pool = front_pool
+        self.limiter = limiter
+        self.reaper = reaper
+        self.relay_buffers = relay_buffers or RelayBuffers()
+
+    def _track(self, *writers):
+        return self.reaper.track(*writers) if self.reaper is not None else None
+
+    async def _admit(self, client_writer, priority: int) -> bool:
+        if self.limiter is None:
+            return True
+        peer = client_writer.get_extra_info('peername')
+        return await self.limiter.acquire(priority, client=peer[0] if peer else None)
+
+    def _release(self, client_writer):
+        if self.limiter is not None:
+            peer = client_writer.get_extra_info('peername')
+            self.limiter.release(peer[0] if peer else None)
+
+    def _buckets(self, writer) -> tuple:
+        if self.limiter is None:
+            return None, None
+        peer = writer.get_extra_info('peername')
+        return self.limiter.buckets(peer[0] if peer else None)
 
     def _make_fragmenter(self) -> TLSFragmenter:
-        conn_id = uuid.uuid4().bytes
-        engine = ChaosEngine(connection_id=conn_id)
-        return TLSFragmenter(engine, aggressive=self._aggressive)
+        if self.engine_pool is not None:
+            conn_id = self.engine_pool.next_connection_id()
+            engine = self.engine_pool.checkout(conn_id)
+        else:
+            conn_id = uuid.uuid4().bytes
+            engine = CompactChaosEngine(connection_id=conn_id, monitor=self.tls.monitor)
+        return self.tls.spawn(engine)
+
+    def _fragment_first(self, data: bytes, level=None) -> tuple:
+        conn_fragmenter = self._make_fragmenter()
+        try:
+            return conn_fragmenter.fragment(data, level), conn_fragmenter.probe, conn_fragmenter.level
+        finally:
+            if self.engine_pool is not None:
+                self.engine_pool.checkin(conn_fragmenter.chaos)
+
+    async def _send_fragments(self, remote_writer, fragments: list):
+        controller = self.tls.controller
+        if controller is not None:
+            controller.pending += 1
+        try:
+            for chunk, delay in fragments:
+                remote_writer.write(chunk)
+                await remote_writer.drain()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+        finally:
+            if controller is not None:
+                controller.pending -= 1
+
+    async def _record_route(self, writer, plan):
+        conn_id = writer.get_extra_info('peername', ('unknown',))[0]
+        if plan.bypass:
+            logger.info(f"🔀 Bypass: {plan.host}" + (f" ({plan.ip})" if plan.bypass_reason == 'ip_bypass' else ""))
+            await self.stats.record_bypass(conn_id, plan.bypass_reason)
+        else:
+            logger.info(f"🔒 Tunnel: {plan.host}")
+            await self.stats.record_tunnel(conn_id)
+
+    async def _connect_remote(self, host: str, port: int, ip: Optional[str] = None):
+        ip = ip or await self.routes.resolve(host)
+        if not ip:
+            return None
+        try:
+            return await asyncio.wait_for(asyncio.open_connection(ip, port), timeout=10.0)
+        except Exception as e:
+            logger.debug(f"Reconnect to {host}:{port} failed: {e}")
+            return None
+
+    async def _connect_front(self, front: str, port: int):
+        ip = self.fronter.address(front)
+        if ip and self.front_pool is not None:
+            conn = self.front_pool.acquire(ip, port)
+            if conn is not None:
+                return conn
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        conn = await self._connect_remote(front, port, ip)
+        if conn is None:
+            self.fronter.record_failure(front)
+        else:
+            self.fronter.record_connect(front, (loop.time() - started) * 1000)
+        return conn
+
+    async def _read_client_hello(self, client_reader, data: bytes = b'') -> bytes:
+        data = data or await client_reader.read(65536)
+        if TLSParser.is_client_hello(data):
+            record_end = 5 + struct.unpack('!H', data[3:5])[0]
+            if len(data) < record_end:
+                try:
+                    data += await client_reader.readexactly(record_end - len(data))
+                except asyncio.IncompleteReadError as e:
+                    data += e.partial
+        return data
+
+    async def _open_upstream(self, client_reader, client_writer, remote_reader, remote_writer, reconnect=None,
+                             on_upstream=None, early: bytes = b''):
+        hello = asyncio.ensure_future(self._read_client_hello(client_reader, early))
+        banner = asyncio.ensure_future(remote_reader.read(65536))
+        try:
+            await asyncio.wait((hello, banner), return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            hello.cancel()
+            banner.cancel()
+            raise
+
+        if banner.done():
+            try:
+                response = banner.result()
+            except (ConnectionError, OSError):
+                response = b''
+            if response:
+                client_writer.write(response)
+                await client_writer.drain()
+            return remote_reader, remote_writer, 0, len(response), hello
+
+        banner.cancel()
+        await asyncio.wait((banner,))
+        data = hello.result()
+        if not TLSParser.is_client_hello(data):
+            if data:
+                remote_writer.write(data)
+                await remote_writer.drain()
+            return remote_reader, remote_writer, len(data), 0, None
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        level = None
+        attempt = 0
+
+        while True:
+            attempt_started = loop.time()
+            fragments, probe, level = self._fragment_first(data, level)
+            try:
+                await self._send_fragments(remote_writer, fragments)
+                response = await asyncio.wait_for(remote_reader.read(65536), self.FIRST_RESPONSE_TIMEOUT)
+            except asyncio.TimeoutError:
+                if probe is not None:
+                    probe.failure()
+                logger.debug(f"No first response within {self.FIRST_RESPONSE_TIMEOUT:.0f}s, relaying as is")
+                return remote_reader, remote_writer, len(data), 0, None
+            except (ConnectionError, OSError):
+                response = b''
+            except BaseException:
+                if probe is not None:
+                    probe.abandon()
+                raise
+
+            if response:
+                if probe is not None:
+                    probe.success()
+                if on_upstream is not None:
+                    on_upstream(True)
+                if attempt:
+                    await self.stats.record_retry(attempt, True, (attempt_started - started) * 1000)
+                client_writer.write(response)
+                await client_writer.drain()
+                return remote_reader, remote_writer, len(data), len(response), None
+
+            if probe is not None:
+                probe.failure()
+
+            early = loop.time() - attempt_started < self.retry_window
+            next_conn = None
+            if early and reconnect is not None and attempt < self.max_retries:
+                attempt += 1
+                level = min(STRATEGY_RECORDS, level + 1)
+                logger.info(f"🔁 Early upstream reset, retry {attempt}/{self.max_retries} "
+                            f"with stronger strategy")
+                remote_writer.close()
+                next_conn = await reconnect(attempt)
+
+            if next_conn is None:
+                if on_upstream is not None:
+                    on_upstream(False)
+                if attempt:
+                    await self.stats.record_retry(attempt, False, (loop.time() - started) * 1000)
+                remote_writer.close()
+                return None
+
+            remote_reader, remote_writer = next_conn
 
     async def detect(self, first_bytes: bytes) -> bool:
         raise NotImplementedError
@@ -36,6 +234,8 @@ class ProtocolHandler:
 
 class HTTPHandler(ProtocolHandler):
 
+    ADMITS_UPSTREAM = True
+
     async def detect(self, first_bytes: bytes) -> bool:
 
         try:
@@ -85,15 +285,7 @@ class HTTPHandler(ProtocolHandler):
                 host = url
                 port = 443
 
-            conn_id = writer.get_extra_info('peername', ('unknown',))[0]
-            if self.bypass.should_bypass_domain(host):
-                logger.info(f"🔀 Bypass: {host}")
-                await self.stats.record_bypass(conn_id, 'domain_bypass')
-                await self._relay_connect(reader, writer, host, port, bypass=True)
-            else:
-                logger.info(f"🔒 Tunnel: {host}")
-                await self.stats.record_tunnel(conn_id)
-                await self._relay_connect(reader, writer, host, port, bypass=False)
+            await self._relay_connect(reader, writer, host, port, first_bytes.partition(b'\r\n\r\n')[2])
 
         except Exception as e:
             logger.error(f"CONNECT error: {e}")
@@ -105,101 +297,138 @@ class HTTPHandler(ProtocolHandler):
             host = parsed.hostname or parsed.path.split('/')[0]
             port = parsed.port or 80
 
-            bypass = self.bypass.should_bypass_domain(host)
-            if bypass:
-                logger.info(f"🔀 Bypass HTTP: {host}")
-            else:
-                logger.info(f"🔒 Tunnel HTTP: {host}")
-
-            await self._relay_connect(reader, writer, host, port, bypass=bypass)
+            await self._relay_connect(reader, writer, host, port)
 
         except Exception as e:
             logger.error(f"HTTP error: {e}")
 
-    NO_FRONT_DOMAINS = {
-        'google.com', 'youtube.com', 'googleapis.com', 'gstatic.com',
-        'googlevideo.com', 'ggpht.com', 'googleusercontent.com',
-        'ytimg.com', 'youtu.be', 'gmail.com', 'accounts.google.com',
-    }
-
-    async def _relay_connect(self, client_reader, client_writer, host: str, port: int, bypass: bool):
+    async def _relay_connect(self, client_reader, client_writer, host: str, port: int, early: bytes = b''):
+        priority = PRIORITY_HANDSHAKE if TLSParser.is_client_hello(early) else PRIORITY_NEW
+        if not await self._admit(client_writer, priority):
+            logger.warning(f"Connection shed (overloaded): {host}:{port}")
+            client_writer.write(b'HTTP/1.1 503 Service Unavailable\r\n\r\n')
+            await client_writer.drain()
+            return
 
         try:
-            connect_host = host
-            if not bypass and port == 443 and self.fronter is not None:
-                host_lower = host.lower()
-                can_front = not any(
-                    host_lower == d or host_lower.endswith('.' + d)
-                    for d in self.NO_FRONT_DOMAINS
-                )
-                if can_front:
-                    front = self.fronter.select_front_domain(real_domain=host)
-                    if front:
-                        connect_host = front
-
-            ip = await self.dns.resolve(connect_host)
-            if not ip:
-                logger.error(f"DNS resolution failed: {host}")
+            plan = await self.routes.plan(host, port, allow_front=True)
+            if plan is None:
                 client_writer.write(b'HTTP/1.1 502 Bad Gateway\r\n\r\n')
                 await client_writer.drain()
                 return
 
+            await self._record_route(client_writer, plan)
+            connect_host = plan.connect_host
+
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            warm = None
+            if plan.fronted and self.front_pool is not None:
+                warm = self.front_pool.acquire(plan.connect_ip, port)
             try:
-                remote_reader, remote_writer = await asyncio.wait_for(
-                    asyncio.open_connection(ip, port),
+                remote_reader, remote_writer = warm or await asyncio.wait_for(
+                    asyncio.open_connection(plan.connect_ip, port),
                     timeout=10.0
                 )
             except asyncio.TimeoutError:
+                if plan.fronted:
+                    self.fronter.record_failure(connect_host)
                 client_writer.write(b'HTTP/1.1 504 Gateway Timeout\r\n\r\n')
                 await client_writer.drain()
                 return
             except Exception as e:
                 logger.error(f"Connection failed to {connect_host}:{port} - {e}")
+                if plan.fronted:
+                    self.fronter.record_failure(connect_host)
                 client_writer.write(b'HTTP/1.1 502 Bad Gateway\r\n\r\n')
                 await client_writer.drain()
                 return
 
+            if plan.fronted and warm is None:
+                self.fronter.record_connect(connect_host, (loop.time() - started) * 1000)
+
             client_writer.write(b'HTTP/1.1 200 Connection Established\r\n\r\n')
             await client_writer.drain()
 
-            await self._relay_data(client_reader, client_writer, remote_reader, remote_writer)
+            async def reconnect(attempt):
+                nonlocal connect_host
+                if not plan.fronted:
+                    return await self._connect_remote(host, port)
+                self.fronter.record_failure(connect_host, reset=True)
+                connect_host = self.fronter.select_front_domain(real_domain=host) or connect_host
+                return await self._connect_front(connect_host, port)
+
+            def upstream_result(ok):
+                if not plan.fronted:
+                    return
+                if ok:
+                    self.fronter.record_success(connect_host)
+                else:
+                    self.fronter.record_failure(connect_host, reset=True)
+
+            await self._relay_data(client_reader, client_writer, remote_reader, remote_writer, reconnect,
+                                   not plan.fragment, upstream_result, early)
 
         except Exception as e:
             logger.error(f"Relay error: {e}")
         finally:
+            self._release(client_writer)
             try:
                 remote_writer.close()
                 await remote_writer.wait_closed()
             except:
                 pass
 
-    async def _relay_data(self, client_reader, client_writer, remote_reader, remote_writer):
-        conn_fragmenter = self._make_fragmenter() if self.tls is not None else None
+    async def _relay_data(self, client_reader, client_writer, remote_reader, remote_writer, reconnect=None,
+                          bypass=False, on_upstream=None, early: bytes = b''):
+        reap = self._track(client_writer, remote_writer)
+        first_sent = first_recv = 0
+        pending = None
+        if self.tls is not None and not bypass:
+            opened = await self._open_upstream(client_reader, client_writer, remote_reader, remote_writer, reconnect,
+                                               on_upstream, early)
+            if opened is None:
+                if reap is not None:
+                    reap.forget()
+                return
+            remote_reader, remote_writer, first_sent, first_recv, pending = opened
+            if reap is not None:
+                reap.writers = (client_writer, remote_writer)
+        elif early:
+            remote_writer.write(early)
+            first_sent = len(early)
+
+        upload, download = self._buckets(client_writer)
 
         async def forward_client_to_remote():
-            first = True
-            total_sent = 0
+            nonlocal pending
+            total_sent = first_sent
+            debt = 0
+            sizer = self.relay_buffers.flow(client_writer, client_reader, remote_writer)
             try:
                 while True:
-                    data = await client_reader.read(65536)
+                    if pending is not None:
+                        data = await pending
+                        pending = None
+                    else:
+                        data = await client_reader.read(sizer.size)
+                        sizer.update(len(data))
                     if not data:
                         break
-                    if first and conn_fragmenter is not None:
-                        first = False
-                        fragments = conn_fragmenter.fragment(data)
-                        for chunk, delay in fragments:
-                            remote_writer.write(chunk)
-                            await remote_writer.drain()
-                            if delay > 0:
-                                await asyncio.sleep(delay)
-                    else:
-                        first = False
-                        remote_writer.write(data)
-                        await remote_writer.drain()
+                    if reap is not None:
+                        reap.touch()
+                    remote_writer.write(data)
+                    await remote_writer.drain()
                     total_sent += len(data)
+                    if upload is not None:
+                        debt += len(data)
+                        if debt >= upload.quantum:
+                            await upload.pace(debt)
+                            debt = 0
             except Exception as e:
                 logger.debug(f"Forward client->remote error: {e}")
             finally:
+                sizer.close()
                 try:
                     if remote_writer.can_write_eof():
                         remote_writer.write_eof()
@@ -208,17 +437,29 @@ class HTTPHandler(ProtocolHandler):
             return total_sent
 
         async def forward_remote_to_client():
-            total_recv = 0
+            total_recv = first_recv
+            debt = 0
+            sizer = self.relay_buffers.flow(client_writer, remote_reader, client_writer)
             try:
                 while True:
-                    data = await remote_reader.read(65536)
+                    data = await remote_reader.read(sizer.size)
                     if not data:
                         break
+                    sizer.update(len(data))
+                    if reap is not None:
+                        reap.touch()
                     client_writer.write(data)
                     await client_writer.drain()
                     total_recv += len(data)
+                    if download is not None:
+                        debt += len(data)
+                        if debt >= download.quantum:
+                            await download.pace(debt)
+                            debt = 0
             except Exception as e:
                 logger.debug(f"Forward remote->client error: {e}")
+            finally:
+                sizer.close()
             return total_recv
 
         results = await asyncio.gather(
@@ -233,6 +474,8 @@ class HTTPHandler(ProtocolHandler):
             conn_id = id(client_writer)
             await self.stats.record_traffic(str(conn_id), bytes_sent=sent, bytes_received=recv)
 
+        if reap is not None:
+            reap.forget()
         for writer in (remote_writer, client_writer):
             try:
                 writer.close()
@@ -242,6 +485,8 @@ class HTTPHandler(ProtocolHandler):
 
 class SOCKS5Handler(ProtocolHandler):
 
+    ADMITS_UPSTREAM = True
+
     async def detect(self, first_bytes: bytes) -> bool:
 
         try:
@@ -251,6 +496,7 @@ class SOCKS5Handler(ProtocolHandler):
 
     async def handle(self, reader, writer, first_bytes: bytes):
 
+        admitted = False
         try:
             if len(first_bytes) < 2:
                 return
@@ -288,7 +534,7 @@ class SOCKS5Handler(ProtocolHandler):
                 host = addr_data.decode('utf-8')
             elif atyp == 0x04:
                 addr_data = await reader.read(16)
-                host = addr_data.hex()
+                host = str(ipaddress.IPv6Address(addr_data))
             else:
                 writer.write(b'\x05\x08\x00\x01\x00\x00\x00\x00\x00\x00')
                 return
@@ -298,23 +544,22 @@ class SOCKS5Handler(ProtocolHandler):
 
             logger.info(f"SOCKS5: {host}:{port}")
 
-            conn_id = writer.get_extra_info('peername', ('unknown',))[0]
-            bypass = self.bypass.should_bypass_domain(host)
-            if bypass:
-                logger.info(f"🔀 Bypass: {host}")
-                await self.stats.record_bypass(conn_id, 'domain_bypass')
-            else:
-                logger.info(f"🔒 Tunnel: {host}")
-                await self.stats.record_tunnel(conn_id)
+            admitted = await self._admit(writer, PRIORITY_HANDSHAKE)
+            if not admitted:
+                logger.warning(f"Connection shed (overloaded): {host}:{port}")
+                writer.write(b'\x05\x01\x00\x01\x00\x00\x00\x00\x00\x00')
+                return
 
-            ip = await self.dns.resolve(host)
-            if not ip:
+            plan = await self.routes.plan(host, port)
+            if plan is None:
                 writer.write(b'\x05\x04\x00\x01\x00\x00\x00\x00\x00\x00')
                 return
 
+            await self._record_route(writer, plan)
+
             try:
                 remote_reader, remote_writer = await asyncio.wait_for(
-                    asyncio.open_connection(ip, port),
+                    asyncio.open_connection(plan.connect_ip, port),
                     timeout=10.0
                 )
             except:
@@ -324,44 +569,69 @@ class SOCKS5Handler(ProtocolHandler):
             writer.write(b'\x05\x00\x00\x01\x00\x00\x00\x00\x00\x00')
             await writer.drain()
 
-            await self._relay_data(reader, writer, remote_reader, remote_writer)
+            async def reconnect(attempt):
+                return await self._connect_remote(host, port)
+
+            await self._relay_data(reader, writer, remote_reader, remote_writer, reconnect, not plan.fragment)
 
         except Exception as e:
             logger.error(f"SOCKS5 error: {e}")
         finally:
+            if admitted:
+                self._release(writer)
             try:
                 writer.close()
                 await writer.wait_closed()
             except:
                 pass
 
-    async def _relay_data(self, client_reader, client_writer, remote_reader, remote_writer):
-        conn_fragmenter = self._make_fragmenter() if self.tls is not None else None
+    async def _relay_data(self, client_reader, client_writer, remote_reader, remote_writer, reconnect=None,
+                          bypass=False, on_upstream=None):
+        reap = self._track(client_writer, remote_writer)
+        first_sent = first_recv = 0
+        pending = None
+        if self.tls is not None and not bypass:
+            opened = await self._open_upstream(client_reader, client_writer, remote_reader, remote_writer, reconnect,
+                                               on_upstream)
+            if opened is None:
+                if reap is not None:
+                    reap.forget()
+                return
+            remote_reader, remote_writer, first_sent, first_recv, pending = opened
+            if reap is not None:
+                reap.writers = (client_writer, remote_writer)
+
+        upload, download = self._buckets(client_writer)
 
         async def forward_client_to_remote():
-            first = True
-            total_sent = 0
+            nonlocal pending
+            total_sent = first_sent
+            debt = 0
+            sizer = self.relay_buffers.flow(client_writer, client_reader, remote_writer)
             try:
                 while True:
-                    data = await client_reader.read(65536)
+                    if pending is not None:
+                        data = await pending
+                        pending = None
+                    else:
+                        data = await client_reader.read(sizer.size)
+                        sizer.update(len(data))
                     if not data:
                         break
-                    if first and conn_fragmenter is not None:
-                        first = False
-                        fragments = conn_fragmenter.fragment(data)
-                        for chunk, delay in fragments:
-                            remote_writer.write(chunk)
-                            await remote_writer.drain()
-                            if delay > 0:
-                                await asyncio.sleep(delay)
-                    else:
-                        first = False
-                        remote_writer.write(data)
-                        await remote_writer.drain()
+                    if reap is not None:
+                        reap.touch()
+                    remote_writer.write(data)
+                    await remote_writer.drain()
                     total_sent += len(data)
+                    if upload is not None:
+                        debt += len(data)
+                        if debt >= upload.quantum:
+                            await upload.pace(debt)
+                            debt = 0
             except Exception:
                 pass
             finally:
+                sizer.close()
                 try:
                     if remote_writer.can_write_eof():
                         remote_writer.write_eof()
@@ -370,17 +640,29 @@ class SOCKS5Handler(ProtocolHandler):
             return total_sent
 
         async def forward_remote_to_client():
-            total_recv = 0
+            total_recv = first_recv
+            debt = 0
+            sizer = self.relay_buffers.flow(client_writer, remote_reader, client_writer)
             try:
                 while True:
-                    data = await remote_reader.read(65536)
+                    data = await remote_reader.read(sizer.size)
                     if not data:
                         break
+                    sizer.update(len(data))
+                    if reap is not None:
+                        reap.touch()
                     client_writer.write(data)
                     await client_writer.drain()
                     total_recv += len(data)
+                    if download is not None:
+                        debt += len(data)
+                        if debt >= download.quantum:
+                            await download.pace(debt)
+                            debt = 0
             except Exception:
                 pass
+            finally:
+                sizer.close()
             return total_recv
 
         results = await asyncio.gather(
@@ -395,6 +677,8 @@ class SOCKS5Handler(ProtocolHandler):
             conn_id = id(client_writer)
             await self.stats.record_traffic(str(conn_id), bytes_sent=sent, bytes_received=recv)
 
+        if reap is not None:
+            reap.forget()
         for writer in (remote_writer, client_writer):
             try:
                 writer.close()
@@ -449,16 +733,17 @@ class WebSocketHandler(ProtocolHandler):
 
             logger.info(f"WebSocket tunnel: {host}:{port}")
 
-            bypass = self.bypass.should_bypass_domain(host)
-            ip = await self.dns.resolve(host)
-            if not ip:
+            plan = await self.routes.plan(host, port)
+            if plan is None:
                 logger.error(f"DNS failed for WebSocket host: {host}")
                 writer.close()
                 return
 
+            await self._record_route(writer, plan)
+
             try:
                 remote_reader, remote_writer = await asyncio.wait_for(
-                    asyncio.open_connection(ip, port),
+                    asyncio.open_connection(plan.connect_ip, port),
                     timeout=10.0
                 )
             except Exception as e:
@@ -478,75 +763,66 @@ class WebSocketHandler(ProtocolHandler):
                 pass
 
     async def _relay_ws(self, client_reader, client_writer, remote_reader, remote_writer):
+        upload, download = self._buckets(client_writer)
+        reap = self._track(client_writer, remote_writer)
+        codec = WebSocketCodec(client_reader, client_writer)
+
         async def ws_client_to_remote():
+            debt = 0
+            sizer = self.relay_buffers.flow(client_writer, client_reader, remote_writer)
             try:
-                while True:
-                    header = await client_reader.readexactly(2)
-                    if not header:
-                        break
-                    opcode = header[0] & 0x0F
-                    masked = (header[1] & 0x80) != 0
-                    payload_len = header[1] & 0x7F
-
-                    if payload_len == 126:
-                        ext = await client_reader.readexactly(2)
-                        payload_len = struct.unpack('!H', ext)[0]
-                    elif payload_len == 127:
-                        ext = await client_reader.readexactly(8)
-                        payload_len = struct.unpack('!Q', ext)[0]
-
-                    mask_key = b''
-                    if masked:
-                        mask_key = await client_reader.readexactly(4)
-
-                    payload = await client_reader.readexactly(payload_len)
-
-                    if masked:
-                        payload = bytes(b ^ mask_key[i % 4] for i, b in enumerate(payload))
-                    if opcode == 8:
-                        break
-                    elif opcode in (9, 10):
-                        continue  
+                while (payload := await codec.read_data()) is not None:
+                    sizer.update(len(payload))
+                    if reap is not None:
+                        reap.touch()
                     if payload:
                         remote_writer.write(payload)
                         await remote_writer.drain()
+                        if upload is not None:
+                            debt += len(payload)
+                            if debt >= upload.quantum:
+                                await upload.pace(debt)
+                                debt = 0
 
+            except WebSocketError as e:
+                logger.debug(f"WS client->remote: {e}")
+                codec.close(e.code, e.reason)
             except (asyncio.IncompleteReadError, ConnectionResetError):
                 pass
             except Exception as e:
                 logger.debug(f"WS client->remote: {e}")
             finally:
+                sizer.close()
                 try:
                     remote_writer.close()
                 except:
                     pass
 
         async def raw_remote_to_ws_client():
+            debt = 0
+            sizer = self.relay_buffers.flow(client_writer, remote_reader, client_writer)
             try:
                 while True:
-                    data = await remote_reader.read(65536)
+                    data = await remote_reader.read(sizer.size)
                     if not data:
                         break
-                    frame = bytearray()
-                    frame.append(0x82)
-                    length = len(data)
-                    if length < 126:
-                        frame.append(length)
-                    elif length < 65536:
-                        frame.append(126)
-                        frame += struct.pack('!H', length)
-                    else:
-                        frame.append(127)
-                        frame += struct.pack('!Q', length)
-                    frame += data
-
-                    client_writer.write(bytes(frame))
+                    sizer.update(len(data))
+                    if reap is not None:
+                        reap.touch()
+                    codec.send(OP_BINARY, data)
                     await client_writer.drain()
+                    if download is not None:
+                        debt += len(data)
+                        if debt >= download.quantum:
+                            await download.pace(debt)
+                            debt = 0
 
             except Exception as e:
                 logger.debug(f"WS remote->client: {e}")
             finally:
+                sizer.close()
                 try:
+                    codec.close()
                     client_writer.close()
                 except:
                     pass
@@ -556,12 +832,22 @@ class WebSocketHandler(ProtocolHandler):
             raw_remote_to_ws_client(),
             return_exceptions=True
         )
-
-def create_handlers(chaos_engine, dns_resolver, bypass_manager, stats_collector, tls_fragmenter=None, domain_fronter=None):
+        if reap is not None:
+            reap.forget()
+
+def create_handlers(chaos_engine, dns_resolver, bypass_manager, stats_collector, tls_fragmenter=None, domain_fronter=None, engine_pool=None,
+                    max_retries=2, retry_window_ms=3000, route_planner=None, front_pool=None, limiter=None, reaper=None,
+                    relay_buffers=None):
+    route_planner = route_planner or RoutePlanner(dns_resolver, bypass_manager, domain_fronter)
+    relay_buffers = relay_buffers or RelayBuffers()
     return [
-        HTTPHandler(chaos_engine, dns_resolver, bypass_manager, stats_collector, tls_fragmenter, domain_fronter),
-        SOCKS5Handler(chaos_engine, dns_resolver, bypass_manager, stats_collector, tls_fragmenter, domain_fronter),
-        WebSocketHandler(chaos_engine, dns_resolver, bypass_manager, stats_collector),
+        HTTPHandler(chaos_engine, dns_resolver, bypass_manager, stats_collector, tls_fragmenter, domain_fronter, engine_pool,
+                    max_retries, retry_window_ms, route_planner, front_pool, limiter, reaper, relay_buffers),
+        SOCKS5Handler(chaos_engine, dns_resolver, bypass_manager, stats_collector, tls_fragmenter, domain_fronter, engine_pool,
+                      max_retries, retry_window_ms, route_planner, limiter=limiter, reaper=reaper,
+                      relay_buffers=relay_buffers),
+        WebSocketHandler(chaos_engine, dns_resolver, bypass_manager, stats_collector, route_planner=route_planner,
+                         limiter=limiter, reaper=reaper, relay_buffers=relay_buffers),
     ]
 
 #این منو به گاه داد
\ No newline at end of file
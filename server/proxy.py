@@ -2,17 +2,21 @@ import asyncio
 import logging
 import uuid
 
+from monitoring.limiter import PRIORITY_NEW
+
 logger = logging.getLogger('CTE.Proxy')
 
 class ProxyServer:
 
-    def __init__(self, host, port, handlers, limiter, stats_collector, buffers):
+    def __init__(self, host, port, handlers, limiter, stats_collector, buffers, reuse_port=False, on_listen=None):
         self.host = host
         self.port = port
         self.handlers = handlers
         self.limiter = limiter
         self.stats = stats_collector
         self.buffers = buffers
+        self.reuse_port = reuse_port
+        self.on_listen = on_listen
 
         self.server = None
         self.running = False
@@ -27,7 +31,8 @@ class ProxyServer:
             self.server = await asyncio.start_server(
                 self._handle_connection,
                 self.host,
-                self.port
+                self.port,
+                reuse_port=self.reuse_port or None
             )
 
             self.running = True
@@ -41,6 +46,8 @@ class ProxyServer:
             logger.info("=" * 60)
 
             await self.server.start_serving()
+            if self.on_listen is not None:
+                self.on_listen()
             await self._shutdown_event.wait()
 
         except Exception as e:
@@ -79,17 +86,9 @@ class ProxyServer:
 
         conn_id = str(uuid.uuid4())[:8]
         client_addr = writer.get_extra_info('peername')
+        client_ip = client_addr[0] if client_addr else None
 
-        if not await self.limiter.acquire(timeout=1.0):
-            logger.warning(f"Connection rejected (limit reached): {client_addr}")
-            try:
-                writer.close()
-                await writer.wait_closed()
-            except:
-                pass
-            self._active_tasks.discard(task)
-            return
-
+        admitted = False
         try:
             first_bytes = await asyncio.wait_for(
                 reader.read(self.buffers.get('small', 8192)),
@@ -104,13 +103,19 @@ class ProxyServer:
                 if await handler.detect(first_bytes):
                     detected_handler = handler
                     protocol_name = handler.__class__.__name__.replace('Handler', '')
-                    logger.info(f"[{conn_id}] Protocol: {protocol_name}")
                     break
 
             if not detected_handler:
                 logger.warning(f"[{conn_id}] Unknown protocol")
                 return
 
+            if not detected_handler.ADMITS_UPSTREAM:
+                admitted = await self.limiter.acquire(PRIORITY_NEW, client=client_ip)
+                if not admitted:
+                    logger.warning(f"[{conn_id}] Connection shed (overloaded): {client_addr}")
+                    return
+
+            logger.info(f"[{conn_id}] Protocol: {protocol_name}")
             await self.stats.connection_started(conn_id, protocol_name, str(client_addr))
             await detected_handler.handle(reader, writer, first_bytes)
             await self.stats.connection_ended(conn_id, success=True)
@@ -130,7 +135,8 @@ class ProxyServer:
             await self.stats.connection_ended(conn_id, success=False)
         finally:
             self._active_tasks.discard(task)
-            await self.limiter.release()
+            if admitted:
+                self.limiter.release(client_ip)
             try:
                 writer.close()
                 await writer.wait_closed()
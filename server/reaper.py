@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import math
+from typing import Optional
+
+logger = logging.getLogger('CTE.Reaper')
+
+class ReapEntry:
+
+    __slots__ = ('reaper', 'writers', 'started', 'seen', 'slot')
+
+    def __init__(self, reaper, writers: tuple):
+        self.reaper = reaper
+        self.writers = writers
+        self.started = self.seen = reaper.clock
+        self.slot = None
+
+    def touch(self):
+        self.seen = self.reaper.clock
+
+    def forget(self):
+        self.reaper.forget(self)
+
+class ConnectionReaper:
+
+    def __init__(self, idle_timeout: float = 60, connection_timeout: float = 0, tick: float = 1.0, stats=None):
+        self.tick = tick
+        self.idle_ticks = math.ceil(idle_timeout / tick) if idle_timeout else 0
+        self.total_ticks = math.ceil(connection_timeout / tick) if connection_timeout else 0
+        self.stats = stats
+
+        self.clock = 0
+        self.wheel = [set() for _ in range((self.idle_ticks or self.total_ticks or 1) + 1)]
+        self.tracked = 0
+        self.reaped_idle = 0
+        self.reaped_lifetime = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.idle_ticks or self.total_ticks)
+
+    def start(self):
+        if self._task is not None or not self.enabled:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"✓ Connection reaper: idle {self.idle_ticks * self.tick:.0f}s, "
+                    f"lifetime {self.total_ticks * self.tick:.0f}s (0 = off)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def track(self, *writers) -> Optional[ReapEntry]:
+        if not self.enabled:
+            return None
+        entry = ReapEntry(self, writers)
+        self._schedule(entry, self._due(entry))
+        self.tracked += 1
+        return entry
+
+    def forget(self, entry: Optional[ReapEntry]):
+        if entry is not None and entry.slot is not None:
+            self.wheel[entry.slot].discard(entry)
+            entry.slot = None
+            self.tracked -= 1
+
+    def _due(self, entry: ReapEntry) -> int:
+        due = entry.seen + self.idle_ticks if self.idle_ticks else math.inf
+        if self.total_ticks:
+            due = min(due, entry.started + self.total_ticks)
+        return due
+
+    def _schedule(self, entry: ReapEntry, due: int):
+        slot = min(due, self.clock + len(self.wheel) - 1) % len(self.wheel)
+        self.wheel[slot].add(entry)
+        entry.slot = slot
+
+    def _advance(self) -> tuple:
+        idle = lifetime = 0
+        slot = self.clock % len(self.wheel)
+        due_now, self.wheel[slot] = self.wheel[slot], set()
+        for entry in due_now:
+            due = self._due(entry)
+            if due > self.clock:
+                self._schedule(entry, due)
+                continue
+
+            entry.slot = None
+            self.tracked -= 1
+            if all(writer.is_closing() for writer in entry.writers):
+                continue
+            if self.total_ticks and self.clock >= entry.started + self.total_ticks:
+                lifetime += 1
+            else:
+                idle += 1
+            for writer in entry.writers:
+                try:
+                    writer.transport.abort()
+                except Exception:
+                    pass
+        return idle, lifetime
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        origin = loop.time()
+        while True:
+            await asyncio.sleep(self.tick)
+            idle = lifetime = 0
+            target = int((loop.time() - origin) / self.tick)
+            while self.clock < target:
+                self.clock += 1
+                reaped = self._advance()
+                idle += reaped[0]
+                lifetime += reaped[1]
+
+            if idle or lifetime:
+                self.reaped_idle += idle
+                self.reaped_lifetime += lifetime
+                logger.info(f"🧹 Reaped {idle + lifetime} connections (idle {idle}, lifetime {lifetime})")
+                if self.stats is not None:
+                    await self.stats.record_reaped(idle, lifetime)
+
+    def get_stats(self) -> dict:
+        return {
+            'tracked': self.tracked,
+            'idle_timeout': self.idle_ticks * self.tick,
+            'connection_timeout': self.total_ticks * self.tick,
+            'reaped_idle': self.reaped_idle,
+            'reaped_lifetime': self.reaped_lifetime,
+        }
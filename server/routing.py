@@ -0,0 +1,136 @@
+import ipaddress
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from utils.domains import DomainMatcher
+
+logger = logging.getLogger('CTE.Routing')
+
+class RoutePlan:
+
+    __slots__ = ('host', 'port', 'ip', 'bypass_reason', 'connect_host', 'connect_ip', 'fragment')
+
+    def __init__(self, host: str, port: int, ip: str, bypass_reason: Optional[str],
+                 connect_host: str, connect_ip: str, fragment: bool):
+        self.host = host
+        self.port = port
+        self.ip = ip
+        self.bypass_reason = bypass_reason
+        self.connect_host = connect_host
+        self.connect_ip = connect_ip
+        self.fragment = fragment
+
+    @property
+    def bypass(self) -> bool:
+        return self.bypass_reason is not None
+
+    @property
+    def fronted(self) -> bool:
+        return self.connect_host != self.host
+
+class RoutePlanner:
+
+    NO_FRONT_DOMAINS = {
+        'google.com', 'youtube.com', 'googleapis.com', 'gstatic.com',
+        'googlevideo.com', 'ggpht.com', 'googleusercontent.com',
+        'ytimg.com', 'youtu.be', 'gmail.com', 'accounts.google.com',
+    }
+    NO_FRONT = DomainMatcher(NO_FRONT_DOMAINS)
+
+    def __init__(self, dns_resolver, bypass_manager, domain_fronter=None, max_entries: int = 4096,
+                 ttl: float = 300):
+        self.dns = dns_resolver
+        self.bypass = bypass_manager
+        self.fronter = domain_fronter
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self.decisions = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def resolve(self, host: str) -> Optional[str]:
+        try:
+            return str(ipaddress.ip_address(host))
+        except ValueError:
+            return await self.dns.resolve(host)
+
+    def bypass_reason(self, host: str, ip: str) -> Optional[str]:
+        if self.bypass.should_bypass_domain(host):
+            return 'domain_bypass'
+        if self.bypass.should_bypass_ip(ip):
+            return 'ip_bypass'
+        return None
+
+    def can_front(self, host: str, port: int) -> bool:
+        return port == 443 and self.fronter is not None and host not in self.NO_FRONT
+
+    async def _decide(self, host: str, port: int, fronting: bool):
+        key = (host.lower(), port)
+        decision = self.decisions.get(key)
+        if decision is not None:
+            if time.monotonic() - decision[2] < self.ttl:
+                self.decisions.move_to_end(key)
+                self.hits += 1
+                return decision
+            del self.decisions[key]
+
+        self.misses += 1
+
+        ip = await self.resolve(host)
+        if not ip:
+            if not fronting or self.bypass.should_bypass_domain(host):
+                logger.error(f"DNS resolution failed: {host}")
+                return None
+            return None, None, 0.0
+
+        decision = (ip, self.bypass_reason(host, ip), time.monotonic())
+        self.decisions[key] = decision
+        while len(self.decisions) > self.max_entries:
+            self.decisions.popitem(last=False)
+        return decision
+
+    async def plan(self, host: str, port: int, allow_front: bool = False) -> Optional[RoutePlan]:
+        fronting = allow_front and self.can_front(host, port)
+        decision = await self._decide(host, port, fronting)
+        if decision is None:
+            return None
+
+        ip, reason, _ = decision
+        connect_host, connect_ip = host, ip
+
+        if reason is None and fronting:
+            front = self.fronter.select_front_domain(real_domain=host)
+            if front:
+                front_ip = self.fronter.address(front)
+                if front_ip is None:
+                    front_ip = await self.resolve(front)
+                    if not front_ip:
+                        logger.error(f"DNS resolution failed: {front}")
+                        return None
+                    self.fronter.pin(front, front_ip)
+                connect_host, connect_ip = front, front_ip
+
+        if not connect_ip:
+            logger.error(f"DNS resolution failed: {host}")
+            return None
+
+        return RoutePlan(host, port, ip, reason, connect_host, connect_ip, fragment=reason is None)
+
+    def invalidate(self):
+        self.decisions.clear()
+        self.invalidations += 1
+        logger.info("🔄 Route plans invalidated")
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self.decisions),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total * 100 if total else 0,
+            'invalidations': self.invalidations,
+        }
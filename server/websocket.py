@@ -0,0 +1,144 @@
+import logging
+import struct
+from typing import Optional, Tuple
+
+logger = logging.getLogger('CTE.WebSocket')
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+CLOSE_NORMAL = 1000
+CLOSE_PROTOCOL_ERROR = 1002
+CLOSE_TOO_BIG = 1009
+
+MAX_FRAME = 16 * 1024 * 1024
+VECTOR_MIN = 512
+
+class WebSocketError(Exception):
+
+    def __init__(self, code: int, reason: str):
+        super().__init__(reason)
+        self.code = code
+        self.reason = reason
+
+def unmask(payload: bytes, key: bytes):
+    length = len(payload)
+    if length < VECTOR_MIN:
+        if not length:
+            return payload
+        mask = (key * ((length + 3) >> 2))[:length]
+        return (int.from_bytes(payload, 'big') ^ int.from_bytes(mask, 'big')).to_bytes(length, 'big')
+
+    import numpy as np
+
+    buffer = bytearray(payload)
+    words = length >> 3
+    view = np.frombuffer(buffer, dtype='<u8', count=words)
+    view ^= np.uint64(int.from_bytes(key * 2, 'little'))
+    for i in range(words << 3, length):
+        buffer[i] ^= key[i & 3]
+    return buffer
+
+def valid_close_code(code: int) -> bool:
+    return 1000 <= code <= 1003 or 1007 <= code <= 1014 or 3000 <= code <= 4999
+
+def frame_header(opcode: int, length: int, fin: bool = True) -> bytes:
+    first = opcode | 0x80 if fin else opcode
+    if length < 126:
+        return bytes((first, length))
+    if length < 65536:
+        return struct.pack('!BBH', first, 126, length)
+    return struct.pack('!BBQ', first, 127, length)
+
+class WebSocketCodec:
+
+    def __init__(self, reader, writer, max_frame: int = MAX_FRAME, require_mask: bool = True):
+        self.reader = reader
+        self.writer = writer
+        self.max_frame = max_frame
+        self.require_mask = require_mask
+
+        self.fragmented = False
+        self.closing = False
+        self.pings = 0
+
+    async def read_frame(self) -> Tuple[bool, int, bytes]:
+        first, second = await self.reader.readexactly(2)
+        if first & 0x70:
+            raise WebSocketError(CLOSE_PROTOCOL_ERROR, 'reserved bits set')
+
+        fin = bool(first & 0x80)
+        opcode = first & 0x0F
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack('!H', await self.reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', await self.reader.readexactly(8))[0]
+
+        if opcode >= OP_CLOSE:
+            if not fin or length > 125:
+                raise WebSocketError(CLOSE_PROTOCOL_ERROR, 'fragmented or oversized control frame')
+        elif length > self.max_frame:
+            raise WebSocketError(CLOSE_TOO_BIG, f'frame of {length} bytes')
+
+        if second & 0x80:
+            key = await self.reader.readexactly(4)
+            return fin, opcode, unmask(await self.reader.readexactly(length), key)
+        if self.require_mask:
+            raise WebSocketError(CLOSE_PROTOCOL_ERROR, 'unmasked client frame')
+        return fin, opcode, await self.reader.readexactly(length)
+
+    async def read_data(self) -> Optional[bytes]:
+        while True:
+            fin, opcode, payload = await self.read_frame()
+
+            if opcode == OP_CLOSE:
+                self._echo_close(payload)
+                return None
+            if opcode == OP_PING:
+                self.pings += 1
+                self.send(OP_PONG, payload)
+                await self.writer.drain()
+                continue
+            if opcode == OP_PONG:
+                continue
+
+            if opcode == OP_CONTINUATION:
+                if not self.fragmented:
+                    raise WebSocketError(CLOSE_PROTOCOL_ERROR, 'unexpected continuation frame')
+            elif opcode in (OP_TEXT, OP_BINARY):
+                if self.fragmented:
+                    raise WebSocketError(CLOSE_PROTOCOL_ERROR, 'expected continuation frame')
+            else:
+                raise WebSocketError(CLOSE_PROTOCOL_ERROR, f'unknown opcode {opcode}')
+
+            self.fragmented = not fin
+            return payload
+
+    def send(self, opcode: int, payload=b'', fin: bool = True):
+        self.writer.writelines((frame_header(opcode, len(payload), fin), payload))
+
+    def close(self, code: int = CLOSE_NORMAL, reason: str = ''):
+        if self.closing or self.writer.is_closing():
+            return
+        self.closing = True
+        self.send(OP_CLOSE, struct.pack('!H', code) + reason.encode('utf-8')[:123])
+
+    def _echo_close(self, payload: bytes):
+        if not payload:
+            self.close()
+            return
+        code = struct.unpack('!H', payload[:2])[0] if len(payload) >= 2 else 0
+        try:
+            payload[2:].decode('utf-8')
+        except UnicodeDecodeError:
+            code = 0
+        if valid_close_code(code):
+            self.close(code)
+        else:
+            logger.debug(f"Invalid close frame (code {code}, {len(payload)} bytes)")
+            self.close(CLOSE_PROTOCOL_ERROR)
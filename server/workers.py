@@ -0,0 +1,86 @@
+import logging
+import os
+import signal
+import sys
+import time
+
+logger = logging.getLogger('CTE.Workers')
+
+class WorkerSupervisor:
+
+    def __init__(self, workers: int, target, shared_stats=None, restart_delay: float = 1.0):
+        self.workers = workers
+        self.target = target
+        self.shared = shared_stats
+        self.restart_delay = restart_delay
+
+        self.pids = {}
+        self.started = {}
+        self.restarts = 0
+        self.stopping = False
+
+    def _spawn(self, worker_id: int):
+        pid = os.fork()
+        if pid == 0:
+            for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+                signal.signal(sig, signal.SIG_DFL)
+            code = 1
+            try:
+                code = self.target(worker_id) or 0
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+
+        self.pids[pid] = worker_id
+        self.started[worker_id] = time.monotonic()
+        logger.info(f"👷 Worker {worker_id} started (pid {pid})")
+
+    def _forward(self, sig):
+        for pid in list(self.pids):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def _stop(self, sig, frame):
+        if not self.stopping:
+            logger.info(f"📊 Received signal {sig}, stopping {len(self.pids)} workers...")
+        self.stopping = True
+        self._forward(signal.SIGTERM)
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGHUP, lambda sig, frame: self._forward(signal.SIGHUP))
+
+        for worker_id in range(self.workers):
+            self._spawn(worker_id)
+
+        while self.pids:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+
+            worker_id = self.pids.pop(pid, None)
+            if worker_id is None:
+                continue
+            if self.shared is not None:
+                self.shared.retire(worker_id)
+            if self.stopping:
+                continue
+
+            logger.warning(f"💥 Worker {worker_id} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}, "
+                           f"restarting")
+            uptime = time.monotonic() - self.started[worker_id]
+            if uptime < self.restart_delay:
+                time.sleep(self.restart_delay - uptime)
+            if not self.stopping:
+                self.restarts += 1
+                self._spawn(worker_id)
+
+        logger.info("👋 All workers stopped")
+        return 0
@@ -4,19 +4,53 @@ import logging
 from typing import Optional
 from urllib.parse import urlparse
 
+from utils.domains import DomainMatcher
+from utils.ipindex import IPRangeIndex
+
 logger = logging.getLogger('CTE.Bypass')
 
 class BypassManager:
 
-    def __init__(self, config_file='iranian_domains.json'):
+    def __init__(self, config_file='iranian_domains.json', geodata_file=None):
+        self.config_file = config_file
+        self.geodata_file = geodata_file
+        self.geodata = None
+        self.reload()
+
+    def reload(self):
         self.domains = set()
         self.ip_ranges = []
         self.download_mime_types = set()
 
-        self._load_config(config_file)
+        self._load_config(self.config_file)
+        self.domain_matcher = DomainMatcher(self.domains)
+        self.ip_index = IPRangeIndex(self.ip_ranges)
+
+        previous, self.geodata = self.geodata, None
+        if self.geodata_file:
+            self._load_geodata(self.geodata_file)
+        if previous is not None:
+            previous.close()
 
         logger.info(f"Bypass enabled: {len(self.domains)} domains, {len(self.ip_ranges)} IP ranges")
 
+    def _load_geodata(self, geodata_file: str):
+        from utils.geodata import GeoDataset
+
+        try:
+            self.geodata = GeoDataset(geodata_file)
+        except FileNotFoundError:
+            logger.warning(f"Geodata {geodata_file} not found, skipping")
+            return
+        except (OSError, ValueError) as e:
+            logger.error(f"Error loading geodata {geodata_file}: {e}")
+            return
+
+        logger.info(
+            f"✓ Geodata mapped: {len(self.geodata)} domains, {self.geodata.range_count} IP ranges "
+            f"({self.geodata.size / 1024 / 1024:.1f} MB)"
+        )
+
     def _load_config(self, config_file: str):
         try:
             with open(config_file, 'r', encoding='utf-8') as f:
@@ -62,16 +96,10 @@ class BypassManager:
         if hostname in ['localhost', '127.0.0.1', '0.0.0.0', '::1']:
             return True
 
-        if hostname in self.domains:
+        if hostname in self.domain_matcher:
             return True
 
-        for domain in self.domains:
-            if domain.startswith('.') and hostname.endswith(domain):
-                return True
-            if not domain.startswith('.') and hostname.endswith('.' + domain):
-                return True
-
-        return False
+        return self.geodata is not None and self.geodata.match_domain(hostname)
 
     def should_bypass_ip(self, ip_address: str) -> bool:
         if not ip_address:
@@ -83,11 +111,10 @@ class BypassManager:
             if ip.is_loopback or ip.is_private:
                 return True
 
-            for ip_range in self.ip_ranges:
-                if ip in ip_range:
-                    return True
+            if ip in self.ip_index:
+                return True
 
-            return False
+            return self.geodata is not None and self.geodata.match_ip(ip)
         except ValueError:
             return False
 
@@ -0,0 +1,47 @@
+from typing import Iterable, Optional
+
+class DomainMatcher:
+
+    def __init__(self, domains: Iterable[str] = ()):
+        self.domains = set()
+        self.suffixes = set()
+        self.update(domains)
+
+    def add(self, domain: str):
+        domain = domain.strip().lower().rstrip('.')
+        if not domain:
+            return
+        if domain.startswith('.'):
+            self.suffixes.add(domain.lstrip('.'))
+        else:
+            self.domains.add(domain)
+
+    def update(self, domains: Iterable[str]):
+        for domain in domains:
+            self.add(domain)
+
+    def __len__(self) -> int:
+        return len(self.domains) + len(self.suffixes)
+
+    def match(self, hostname: str) -> Optional[str]:
+        if not hostname:
+            return None
+
+        hostname = hostname.lower().rstrip('.')
+        domains = self.domains
+        suffixes = self.suffixes
+
+        if hostname in domains:
+            return hostname
+
+        pos = hostname.find('.')
+        while pos != -1:
+            suffix = hostname[pos + 1:]
+            if suffix in domains or suffix in suffixes:
+                return suffix
+            pos = hostname.find('.', pos + 1)
+
+        return None
+
+    def __contains__(self, hostname: str) -> bool:
+        return self.match(hostname) is not None
@@ -0,0 +1,214 @@
+import argparse
+import csv
+import hashlib
+import ipaddress
+import json
+import mmap
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b'CTEGEO1\x00'
+HEADER = struct.Struct('<8s6I')
+
+SKIPPED_PREFIXES = ('regexp:', 'keyword:', 'include:')
+
+def domain_hash(domain: str) -> np.uint64:
+    return np.uint64(int.from_bytes(hashlib.blake2b(domain.encode('utf-8'), digest_size=8).digest(), 'little'))
+
+def _interval_bytes(networks: list, width: int, byteorder: str) -> tuple:
+    intervals = sorted((int(n.network_address), int(n.broadcast_address)) for n in networks)
+    starts, ends = [], []
+    for start, end in intervals:
+        if ends and start <= ends[-1] + 1:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    pack = lambda values: b''.join(v.to_bytes(width, byteorder) for v in values)
+    return pack(starts), pack(ends), len(starts)
+
+class GeoDataBuilder:
+
+    def __init__(self):
+        self.domains = set()
+        self.suffixes = set()
+        self.exact = set()
+        self.networks = []
+        self.skipped = 0
+
+    def add(self, entry: str):
+        entry = entry.split('#', 1)[0].strip().strip('"').lower()
+        if not entry:
+            return
+
+        if entry.startswith(SKIPPED_PREFIXES):
+            self.skipped += 1
+            return
+        if entry.startswith('full:'):
+            self.exact.add(entry[5:].split('@', 1)[0].strip().rstrip('.'))
+            return
+        tagged = entry.startswith('domain:')
+        if tagged:
+            entry = entry[7:].split('@', 1)[0].strip()
+
+        if entry[0].isdigit() or ':' in entry:
+            try:
+                self.networks.append(ipaddress.ip_network(entry, strict=False))
+                return
+            except ValueError:
+                pass
+
+        entry = entry.rstrip('.')
+        if entry.startswith('.'):
+            self.suffixes.add(entry.lstrip('.'))
+        elif tagged or '.' in entry or not entry.isascii():
+            self.domains.add(entry)
+        else:
+            self.skipped += 1
+
+    def add_file(self, path: str):
+        suffix = Path(path).suffix.lower()
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            if suffix == '.json':
+                data = json.load(f)
+                if isinstance(data, dict):
+                    entries = list(data.get('domains', [])) + list(data.get('ip_ranges', []))
+                else:
+                    entries = data
+                for entry in entries:
+                    self.add(str(entry))
+            elif suffix == '.csv':
+                for row in csv.reader(f):
+                    if row:
+                        self.add(row[0])
+            else:
+                for line in f:
+                    self.add(line)
+
+    def write(self, path: str) -> dict:
+        hashes = [
+            np.unique(np.array([domain_hash(d) for d in group], dtype='<u8'))
+            for group in (self.domains, self.suffixes, self.exact)
+        ]
+        v6_starts, v6_ends, n_v6 = _interval_bytes([n for n in self.networks if n.version == 6], 16, 'big')
+        v4_starts, v4_ends, n_v4 = _interval_bytes([n for n in self.networks if n.version == 4], 4, 'little')
+
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(hashes[0]), len(hashes[1]), len(hashes[2]), n_v6, n_v4, 0))
+            for array in hashes:
+                f.write(array.tobytes())
+            for section in (v6_starts, v6_ends, v4_starts, v4_ends):
+                f.write(section)
+
+        return {
+            'domains': len(hashes[0]),
+            'suffixes': len(hashes[1]),
+            'exact': len(hashes[2]),
+            'ipv4_ranges': n_v4,
+            'ipv6_ranges': n_v6,
+            'skipped': self.skipped,
+        }
+
+class GeoDataset:
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty geodata file: {path}")
+
+        magic, n_domains, n_suffixes, n_exact, n_v6, n_v4, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a compiled geodata file: {path}")
+
+        offset = HEADER.size
+        views = []
+        for dtype, count in (('<u8', n_domains), ('<u8', n_suffixes), ('<u8', n_exact),
+                             ('S16', n_v6), ('S16', n_v6), ('<u4', n_v4), ('<u4', n_v4)):
+            views.append(np.frombuffer(self._mm, dtype=dtype, count=count, offset=offset))
+            offset += views[-1].nbytes
+
+        (self._domains, self._suffixes, self._exact,
+         self._v6_starts, self._v6_ends, self._v4_starts, self._v4_ends) = views
+
+    @staticmethod
+    def _member(array: np.ndarray, value) -> bool:
+        i = array.searchsorted(value)
+        return bool(i < len(array) and array[i] == value)
+
+    def __len__(self) -> int:
+        return len(self._domains) + len(self._suffixes) + len(self._exact)
+
+    @property
+    def range_count(self) -> int:
+        return len(self._v4_starts) + len(self._v6_starts)
+
+    @property
+    def size(self) -> int:
+        return len(self._mm)
+
+    def match_domain(self, hostname: str) -> bool:
+        if not hostname:
+            return False
+
+        hostname = hostname.lower().rstrip('.')
+        h = domain_hash(hostname)
+        if self._member(self._domains, h) or self._member(self._exact, h):
+            return True
+
+        pos = hostname.find('.')
+        while pos != -1:
+            h = domain_hash(hostname[pos + 1:])
+            if self._member(self._domains, h) or self._member(self._suffixes, h):
+                return True
+            pos = hostname.find('.', pos + 1)
+
+        return False
+
+    def match_ip(self, ip) -> bool:
+        try:
+            addr = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        if addr.version == 6 and addr.ipv4_mapped is not None:
+            addr = addr.ipv4_mapped
+
+        if addr.version == 4:
+            starts, ends, value = self._v4_starts, self._v4_ends, np.uint32(int(addr))
+        else:
+            starts, ends, value = self._v6_starts, self._v6_ends, addr.packed.rstrip(b'\x00')
+
+        i = starts.searchsorted(value, side='right') - 1
+        return bool(i >= 0 and value <= ends[i])
+
+    def close(self):
+        self._domains = self._suffixes = self._exact = None
+        self._v6_starts = self._v6_ends = self._v4_starts = self._v4_ends = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Compile domain/CIDR lists into a memory-mappable geodata file')
+    parser.add_argument('inputs', nargs='+', help='JSON (domains/ip_ranges), CSV (first column) or plain list files')
+    parser.add_argument('-o', '--output', required=True, help='compiled output file')
+    args = parser.parse_args(argv)
+
+    builder = GeoDataBuilder()
+    for path in args.inputs:
+        builder.add_file(path)
+
+    counts = builder.write(args.output)
+    print(f"✓ {args.output}: " + ", ".join(f"{k} {v}" for k, v in counts.items()))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
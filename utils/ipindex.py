@@ -0,0 +1,106 @@
+import ipaddress
+import socket
+from bisect import bisect_right
+from typing import Iterable, Union
+
+IPAddress = Union[str, ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+class IPRangeIndex:
+
+    def __init__(self, networks: Iterable = ()):
+        v4, v6 = [], []
+        for network in networks:
+            network = ipaddress.ip_network(network, strict=False)
+            interval = (int(network.network_address), int(network.broadcast_address))
+            (v4 if network.version == 4 else v6).append(interval)
+
+        self._v4_starts, self._v4_ends = self._compile(v4)
+        self._v6_starts, self._v6_ends = self._compile(v6)
+
+        self._v4_np = None
+
+    @staticmethod
+    def _compile(intervals: list) -> tuple:
+        starts, ends = [], []
+        for start, end in sorted(intervals):
+            if ends and start <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        return starts, ends
+
+    def __len__(self) -> int:
+        return len(self._v4_starts) + len(self._v6_starts)
+
+    @staticmethod
+    def _address(ip: IPAddress):
+        addr = ip if isinstance(ip, (ipaddress.IPv4Address, ipaddress.IPv6Address)) else ipaddress.ip_address(ip)
+        if addr.version == 6 and addr.ipv4_mapped is not None:
+            return addr.ipv4_mapped
+        return addr
+
+    @staticmethod
+    def _parse(ip: IPAddress) -> tuple:
+        if isinstance(ip, str) and ':' not in ip:
+            try:
+                return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, ip), 'big')
+            except OSError:
+                return None, 0
+        try:
+            addr = IPRangeIndex._address(ip)
+        except ValueError:
+            return None, 0
+        return addr.version, int(addr)
+
+    def contains(self, ip: IPAddress) -> bool:
+        version, value = self._parse(ip)
+        if version == 4:
+            starts, ends = self._v4_starts, self._v4_ends
+        elif version == 6:
+            starts, ends = self._v6_starts, self._v6_ends
+        else:
+            return False
+
+        i = bisect_right(starts, value) - 1
+        return i >= 0 and value <= ends[i]
+
+    def __contains__(self, ip: IPAddress) -> bool:
+        return self.contains(ip)
+
+    def contains_many(self, ips: Iterable[IPAddress]):
+        import numpy as np
+
+        if self._v4_np is None:
+            self._v4_np = (np.array(self._v4_starts, dtype=np.uint64), np.array(self._v4_ends, dtype=np.uint64))
+        starts, ends = self._v4_np
+
+        ips = list(ips)
+        result = np.zeros(len(ips), dtype=bool)
+
+        try:
+            packed = b''.join([socket.inet_pton(socket.AF_INET, ip) for ip in ips])
+        except (OSError, TypeError):
+            packed = None
+
+        if packed is not None:
+            v4_pos = slice(None)
+            values = np.frombuffer(packed, dtype='>u4').astype(np.uint64)
+        else:
+            v4_pos, v4_values = [], []
+            for pos, ip in enumerate(ips):
+                version, value = self._parse(ip)
+                if version == 4:
+                    v4_pos.append(pos)
+                    v4_values.append(value)
+                elif version == 6:
+                    result[pos] = self.contains(ip)
+            values = np.array(v4_values, dtype=np.uint64)
+
+        if len(values) and len(starts):
+            i = np.searchsorted(starts, values, side='right') - 1
+            hit = i >= 0
+            hit[hit] = values[hit] <= ends[i[hit]]
+            result[v4_pos] = hit
+
+        return result
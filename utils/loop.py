@@ -0,0 +1,33 @@
+import asyncio
+import importlib.util
+import logging
+
+logger = logging.getLogger('CTE.Loop')
+
+LOOPS = ('auto', 'asyncio', 'uvloop')
+
+def uvloop_available() -> bool:
+    return importlib.util.find_spec('uvloop') is not None
+
+def resolve_loop(name: str = 'auto') -> str:
+    name = (name or 'auto').lower()
+    if name not in LOOPS:
+        logger.warning(f"Unknown event loop '{name}', using asyncio")
+        return 'asyncio'
+    if name == 'asyncio':
+        return 'asyncio'
+    if uvloop_available():
+        return 'uvloop'
+    if name == 'uvloop':
+        logger.warning("uvloop not installed, falling back to asyncio")
+    return 'asyncio'
+
+def run(coro, loop: str = 'auto'):
+    if resolve_loop(loop) == 'uvloop':
+        import uvloop
+        return uvloop.run(coro)
+    return asyncio.run(coro)
+
+def loop_name() -> str:
+    module = type(asyncio.get_running_loop()).__module__
+    return 'uvloop' if module.startswith('uvloop') else 'asyncio'
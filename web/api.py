@@ -1,11 +1,19 @@
 from aiohttp import web
 
 class WebAPI:
-    def __init__(self, stats_collector, chaos_engine, dns_resolver, proxy_server):
+    def __init__(self, stats_collector, chaos_engine, dns_resolver, proxy_server, chaos_monitor=None, fragment_controller=None,
+                 strategy_cache=None, route_planner=None, domain_fronter=None, front_pool=None, relay_buffers=None):
         self.stats = stats_collector
         self.chaos = chaos_engine
         self.dns = dns_resolver
         self.proxy = proxy_server
+        self.chaos_monitor = chaos_monitor
+        self.fragment_controller = fragment_controller
+        self.strategy_cache = strategy_cache
+        self.route_planner = route_planner
+        self.domain_fronter = domain_fronter
+        self.front_pool = front_pool
+        self.relay_buffers = relay_buffers
 
     def register_routes(self, app: web.Application):
         app.router.add_get('/api/status', self.get_full_status)
@@ -15,12 +23,17 @@ class WebAPI:
         return web.json_response({
             'status': 'running' if self.proxy.running else 'stopped',
             'stats': await self.stats.get_json_summary(),
+            'admission': self.proxy.limiter.get_stats(),
+            'clients': self.proxy.limiter.get_clients(),
             'chaos': self.chaos.get_chaos_metrics(),
+            'chaos_fleet': self.chaos_monitor.snapshot() if self.chaos_monitor else None,
+            'adaptive': self.fragment_controller.get_stats() if self.fragment_controller else None,
+            'strategies': self.strategy_cache.get_stats() if self.strategy_cache else None,
+            'routes': self.route_planner.get_stats() if self.route_planner else None,
+            'fronts': self.domain_fronter.get_health() if self.domain_fronter else None,
             'dns': self.dns.get_cache_stats(),
-            'pool': {
-                'size': len(self.proxy.connection_pool),
-                'max': self.proxy.pool_max_size
-            }
+            'pool': self.front_pool.get_stats() if self.front_pool else None,
+            'relay_memory': self.relay_buffers.get_stats() if self.relay_buffers else None
         })
 
     async def get_health(self, request):
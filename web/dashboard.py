@@ -21,11 +21,16 @@ async def cors_middleware(request, handler):
 
 class WebDashboard:
 
-    def __init__(self, stats_collector, chaos_engine, dns_resolver, proxy_server=None, port=8080, enabled=True):
+    def __init__(self, stats_collector, chaos_engine, dns_resolver, proxy_server=None, chaos_monitor=None,
+                 fragment_controller=None, strategy_cache=None, domain_fronter=None, port=8080, enabled=True):
         self.stats = stats_collector
         self.chaos = chaos_engine
         self.dns = dns_resolver
         self.proxy = proxy_server
+        self.chaos_monitor = chaos_monitor
+        self.fragment_controller = fragment_controller
+        self.strategy_cache = strategy_cache
+        self.domain_fronter = domain_fronter
         self.port = port
         self.enabled = enabled
         self.app = None
@@ -43,6 +48,7 @@ class WebDashboard:
         self.app.router.add_get('/api/stats', self.handle_stats)
         self.app.router.add_get('/api/chaos', self.handle_chaos)
         self.app.router.add_get('/api/dns', self.handle_dns)
+        self.app.router.add_get('/api/fronts', self.handle_fronts)
         self.app.router.add_static('/static', STATIC_DIR)
 
         if web_api is not None:
@@ -72,8 +78,21 @@ class WebDashboard:
     async def handle_stats(self, request):
         return web.json_response(await self.stats.get_json_summary())
 
+    def get_chaos_metrics(self) -> dict:
+        metrics = self.chaos.get_chaos_metrics()
+        if self.chaos_monitor is not None:
+            metrics = {**self.chaos_monitor.snapshot(), 'engine': metrics}
+        if self.fragment_controller is not None:
+            metrics['adaptive'] = self.fragment_controller.get_stats()
+        if self.strategy_cache is not None:
+            metrics['strategies'] = self.strategy_cache.get_stats()
+        return metrics
+
     async def handle_chaos(self, request):
-        return web.json_response(self.chaos.get_chaos_metrics())
+        return web.json_response(self.get_chaos_metrics())
 
     async def handle_dns(self, request):
-        return web.json_response(self.dns.get_cache_stats())
\ No newline at end of file
+        return web.json_response(self.dns.get_cache_stats())
+
+    async def handle_fronts(self, request):
+        return web.json_response(self.domain_fronter.get_health() if self.domain_fronter else [])
\ No newline at end of file
@@ -53,18 +53,26 @@ const DOM = {
     ssBar:            $('ssBar'),
 
     samplesBadge:     $('samplesBadge'),
+    adaptiveBadge:    $('adaptiveBadge'),
+    strategyBadge:    $('strategyBadge'),
     lyapunovValue:    $('lyapunovValue'),
     lyapunovRing:     $('lyapunovRing'),
     entropyValue:     $('entropyValue'),
     entropyRing:      $('entropyRing'),
     correlationValue: $('correlationValue'),
     correlationRing:  $('correlationRing'),
+    plansCount:       $('plansCount'),
+    fragCountDist:    $('fragCountDist'),
+    jitterDist:       $('jitterDist'),
 
     cacheSizeBadge:   $('cacheSizeBadge'),
     hitRateValue:     $('hitRateValue'),
     hitRateRing:      $('hitRateRing'),
     cacheHits:        $('cacheHits'),
-    cacheMisses:      $('cacheMisses')
+    cacheMisses:      $('cacheMisses'),
+
+    frontsBadge:      $('frontsBadge'),
+    frontList:        $('frontList')
 };
 
 function formatBytes(bytes) {
@@ -168,12 +176,19 @@ function showOffline() {
     [DOM.httpBar, DOM.socks5Bar, DOM.ssBar].forEach(el => el && setBar(el, 0));
 
     setOffline(DOM.samplesBadge);
+    setOffline(DOM.adaptiveBadge);
+    setOffline(DOM.strategyBadge);
     [DOM.lyapunovValue, DOM.entropyValue, DOM.correlationValue].forEach(setOffline);
     [DOM.lyapunovRing, DOM.entropyRing, DOM.correlationRing].forEach(el => setRing(el, 0, 220));
+    setOffline(DOM.plansCount);
+    [DOM.fragCountDist, DOM.jitterDist].forEach(el => { if (el) el.innerHTML = ''; });
 
     setOffline(DOM.cacheSizeBadge);
     [DOM.hitRateValue, DOM.cacheHits, DOM.cacheMisses].forEach(setOffline);
     setRing(DOM.hitRateRing, 0, 327);
+
+    setOffline(DOM.frontsBadge);
+    if (DOM.frontList) DOM.frontList.innerHTML = '';
 }
 
 function clearChart() {
@@ -273,10 +288,53 @@ function updateChaos(d) {
     setText(DOM.entropyValue,     en.toFixed(2));
     setText(DOM.correlationValue, co.toFixed(3));
     if (DOM.samplesBadge) DOM.samplesBadge.textContent = formatNumber(sam) + ' samples';
+    if (DOM.adaptiveBadge) {
+        const ad = d.adaptive;
+        DOM.adaptiveBadge.textContent = ad && ad.enabled
+            ? `level ${(ad.level * 100).toFixed(0)}%`
+            : 'level off';
+        DOM.adaptiveBadge.title = ad
+            ? `pressure ${(ad.pressure * 100).toFixed(0)}% · lag ${ad.loop_lag_ms.toFixed(1)}ms · pending ${ad.pending_fragments}`
+            : '';
+    }
+    if (DOM.strategyBadge) {
+        const st = d.strategies;
+        DOM.strategyBadge.textContent = st ? formatNumber(st.entries) + ' learned' : 'learning off';
+        DOM.strategyBadge.title = st
+            ? Object.entries(st.levels).map(([k, v]) => `${k} ${v}`).join(' · ')
+              + ` · ok ${st.successes} · fail ${st.failures}`
+            : '';
+    }
 
     setRing(DOM.lyapunovRing,    Math.min(Math.abs(ly) * 100, 100), 220);
     setRing(DOM.entropyRing,     Math.min(en / 8 * 100, 100),       220);
     setRing(DOM.correlationRing, Math.min(Math.abs(co) / 3 * 100, 100), 220);
+
+    if (DOM.plansCount) DOM.plansCount.textContent = formatNumber(d.plans || 0) + ' plans';
+    renderDistribution(DOM.fragCountDist, d.fragment_counts || {}, 'http-fill');
+    renderDistribution(DOM.jitterDist,    d.jitter_ms       || {}, 'socks5-fill');
+}
+
+function renderDistribution(el, dist, fillClass) {
+    if (!el) return;
+    const entries = Object.entries(dist);
+    const max = Math.max(1, ...entries.map(([, v]) => v));
+
+    if (el.children.length !== entries.length) {
+        el.innerHTML = entries.map(() => `
+            <div class="dist-row">
+                <span class="dist-lbl"></span>
+                <div class="bar-track sm"><div class="bar-fill ${fillClass}"></div></div>
+                <span class="dist-cnt"></span>
+            </div>`).join('');
+    }
+
+    entries.forEach(([label, count], i) => {
+        const row = el.children[i];
+        row.querySelector('.dist-lbl').textContent = label;
+        row.querySelector('.dist-cnt').textContent = formatNumber(count);
+        setBar(row.querySelector('.bar-fill'), count / max * 100);
+    });
 }
 
 function updateDNS(d) {
@@ -298,6 +356,41 @@ function updateDNS(d) {
     setRing(DOM.hitRateRing, hitRate, 327);
 }
 
+function updateFronts(fronts) {
+    if (!DOM.frontList) return;
+    const ejected = fronts.filter(f => f.ejected_for > 0).length;
+    if (DOM.frontsBadge) {
+        DOM.frontsBadge.textContent = `${fronts.length - ejected}/${fronts.length} healthy`;
+    }
+
+    if (!fronts.length) {
+        DOM.frontList.innerHTML = '<span class="front-empty">Domain fronting disabled</span>';
+        return;
+    }
+
+    if (DOM.frontList.children.length !== fronts.length || !DOM.frontList.querySelector('.front-row')) {
+        DOM.frontList.innerHTML = fronts.map(() => `
+            <div class="front-row">
+                <span class="front-name"></span>
+                <div class="bar-track sm"><div class="bar-fill success-fill"></div></div>
+                <span class="front-lat"></span>
+                <span class="front-state"></span>
+            </div>`).join('');
+    }
+
+    fronts.forEach((f, i) => {
+        const row = DOM.frontList.children[i];
+        row.classList.toggle('ejected', f.ejected_for > 0);
+        row.title = `${f.provider} · ok ${f.successes} · fail ${f.failures} · resets ${f.resets}`;
+        row.querySelector('.front-name').textContent = f.front;
+        row.querySelector('.front-lat').textContent = f.latency_ms === null ? '---' : f.latency_ms.toFixed(0) + ' ms';
+        row.querySelector('.front-state').textContent = f.ejected_for > 0
+            ? `out ${Math.ceil(f.ejected_for)}s`
+            : `${(100 - f.error_rate).toFixed(0)}% ok`;
+        setBar(row.querySelector('.bar-fill'), 100 - f.error_rate);
+    });
+}
+
 function updateDonut(bypassed, tunneled) {
     const total = bypassed + tunneled;
     const CIRC  = 377; 
@@ -398,10 +491,11 @@ async function api(path) {
 
 async function tick() {
     try {
-        const [stats, chaos, dns] = await Promise.all([
+        const [stats, chaos, dns, fronts] = await Promise.all([
             api('/api/stats'),
             api('/api/chaos'),
-            api('/api/dns')
+            api('/api/dns'),
+            api('/api/fronts')
         ]);
 
         if (!state.isConnected) {
@@ -417,6 +511,7 @@ async function tick() {
         updateStats(stats);
         updateChaos(chaos);
         updateDNS(dns);
+        updateFronts(fronts);
 
     } catch (err) {
         console.warn('API unreachable:', err.message);